@@ -2,21 +2,47 @@
 import streamlit as st
 import plotly.graph_objects as go
 import plotly.express as px
+import plotly.io as pio
+from plotly.offline import get_plotlyjs, get_plotlyjs_version
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 import time
 import random
+import asyncio
 import requests
+from requests.adapters import HTTPAdapter
+from urllib.parse import urlparse
 import yfinance as yf
-from collections import defaultdict
+from collections import defaultdict, deque, namedtuple, OrderedDict
+from itertools import product
 import json
 import re
 import io
 import math
 import streamlit.components.v1 as components
 import textwrap
+import html
 import feedparser
+import xml.etree.ElementTree as ET
+import threading
+import functools
+import warnings
+import os
+import sqlite3
+import hashlib
+import base64
+import gzip
+import tempfile
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from trial_ingest import TrialStore
+from provider_replay import FixtureStore, rewrite_url
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet export is offered only when pyarrow is installed
+    pa = pq = None
 
 # ---------------------------
 # Page Configuration
@@ -209,11 +235,1162 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 
+# ---------------------------
+# Quote Fetch Engine Settings
+# ---------------------------
+QUOTE_FETCH_MAX_WORKERS = 8  # Upper bound on concurrent per-symbol fetches
+QUOTE_FETCH_DEADLINE = 12  # Seconds one get_stock_prices() sweep may take before late symbols are simulated
+QUOTE_BATCH_DEADLINE = 6  # Seconds of the sweep the batch stages may take; the per-symbol stage gets the rest
+QUOTE_CACHE_TTL = 30  # Seconds a published quote snapshot is served to every session before it is refetched
+MARKET_DATA_TTL = 900  # Seconds market caps and news are served before they are revalidated in the background
+MARKET_CAP_FETCH_MAX_WORKERS = 8
+MARKET_CAP_FETCH_DEADLINE = 15  # Seconds the per-company market-cap chain may take before fallback values are used
+MARKET_CAP_REFRESH_AHEAD = 0.8  # Fraction of MARKET_DATA_TTL after which market caps are refreshed in the background
+RSS_FETCH_DEADLINE = 12  # Seconds the parallel journal-feed sweep may take
+RSS_ENTRIES_PER_FEED = 2  # Entries kept (and parsed) per journal feed
+
+# Provider client layer: pooled keep-alive sessions, retries and circuit breakers per provider
+HTTP_POOL_MAXSIZE = 16  # Keep-alive connections kept per host (>= the widest fetch thread pool)
+HTTP_RETRIES = 2  # Extra attempts after a connection error or a 429/5xx answer
+HTTP_RETRY_STATUSES = (429, 500, 502, 503, 504)
+HTTP_BACKOFF_BASE = 0.5  # Seconds before the first retry, doubled per attempt, ±50% jitter
+HTTP_BACKOFF_MAX = 4.0
+BREAKER_FAILURE_THRESHOLD = 3  # Consecutive failed calls that open a provider's circuit
+BREAKER_COOLDOWN = 60  # Seconds an open circuit skips the provider before one probe call is let through
+
+# Client-side request budgets of metered providers: (burst requests, refilled over seconds, requests per UTC day).
+# Kept in a token bucket and a daily ledger persisted in SQLite, so restarts and new sessions don't reset them
+PROVIDER_RATE_LIMITS = {
+    'alpha_vantage': (5, 60, 25),  # Free tier: 5 requests/minute, 25/day
+    'fmp': (10, 60, 250),  # Free tier: 250 requests/day
+    'gnews': (3, 3, 100),  # Free tier: 1 request/second on average, 100/day
+}
+QUOTA_LEDGER_DB = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'provider_quota.db')
+
+# Provider registry: per-kind source order and resolution mode ('fallback' tries them in order,
+# 'hedged' races the first two and takes the first usable answer; metered sources are never raced,
+# since a losing call would still spend their quota, so they are tried one at a time in their place)
+PROVIDER_ORDER = {
+    'quote': ('alpha_vantage', 'yahoo'),  # Per-symbol quotes, for symbols the batch requests did not resolve
+    'market_cap': ('fmp', 'yahoo'),
+    'news': ('gnews', 'rss'),
+}
+# Every kind resolves by fallback: each has one unmetered source (Yahoo, Yahoo, RSS) and nothing to race it
+# against, so 'hedged' would only try the metered source on its own first, i.e. behave as 'fallback'.
+# Switch a kind to 'hedged' once it has a second unmetered source registered.
+PROVIDER_MODES = {'quote': 'fallback', 'market_cap': 'fallback', 'news': 'fallback'}
+PROVIDER_LABELS = {'alpha_vantage': 'Alpha Vantage', 'yahoo': 'Yahoo Finance', 'fmp': 'FMP', 'gnews': 'GNews',
+                   'rss': 'Journal RSS'}
+PROVIDER_MAX_WORKERS = 32  # Threads running provider fetches (hedged losers finish here in the background)
+PROVIDER_METRICS_WINDOW = 100  # Latest calls per provider kept for latency percentiles
+
+# Offline benchmarking (see provider_replay.py), both off unless set in the environment:
+# PROVIDER_BASE_URL sends every HTTP provider request to a local stand-in server instead,
+# PROVIDER_RECORD_DIR saves every HTTP provider response there as a replay fixture
+PROVIDER_BASE_URL = os.environ.get('PROVIDER_BASE_URL', '')
+PROVIDER_RECORD_DIR = os.environ.get('PROVIDER_RECORD_DIR', '')
+
+# Persistent price history (SQLite in WAL mode, shared by all sessions and surviving restarts)
+PRICE_HISTORY_DB = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'price_history.db')
+PRICE_HISTORY_RETENTION_DAYS = 30
+EXPORT_CHUNK_ROWS = 50000  # Rows read from the price store and written per export chunk
+PRICE_RING_CAPACITY = 10080  # Most recent ticks per company kept in memory for chart/score windows (a week of minute bars)
+
+# Local ClinicalTrials.gov store, filled offline by `python trial_ingest.py <bulk export>`
+CLINICAL_TRIALS_DB = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'clinical_trials.db')
+TRIALS_PAGE_SIZE = 10  # Trial cards generated and shipped per page of the Clinical Trials tab
+TRIAL_CARD_HEIGHT = 300  # Approximate rendered height of one card (px)
+
+CAROUSEL_INTERVAL = 5  # Seconds between radar carousel rotations
+
+# Streaming stock chart: static component that appends new points with Plotly.extendTraces
+LIVE_CHART_COMPONENT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'components', 'live_stock_chart')
+LIVE_CHART_HEIGHT = 520
+# plotly.js bundled with plotly.py, written next to the component on first use and loaded by a relative path
+PLOTLY_JS_FILE = f"plotly-{get_plotlyjs_version()}.min.js"
+
+# Long price windows: each series is downsampled to about one point per pixel before serialization
+CHART_MAX_POINTS = 1000  # Points per series sent to the browser (roughly the chart's width in pixels)
+WEBGL_POINT_THRESHOLD = 500  # 'Auto' renderer switches from SVG to WebGL (Scattergl) above this many points
+CHART_MARKER_POINT_LIMIT = 100  # Windows longer than this are drawn as lines only
+
+FIGURE_CACHE_SIZE = 64  # Serialized figures kept by the figure cache, least recently used evicted first
+
+
+# ---------------------------
+# SharedDataStore: Process-wide Cache Shared by All Browser Sessions
+# ---------------------------
+class SharedDataStore:
+    """TTL-bounded key/value store living once per server process (see get_shared_data_store)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}  # key -> (value, published_at epoch seconds)
+        self._failures = {}  # key -> (error message, failed_at) for the latest failed refresh
+        self._ttls = {}  # key -> ttl used by stale-while-revalidate readers, for status()
+        self._refresh_locks = defaultdict(threading.Lock)
+
+    def get(self, key, max_age=None):
+        """Return (value, published_at) or None when missing or older than max_age seconds"""
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if max_age is not None and time.time() - entry[1] > max_age:
+            return None
+        return entry
+
+    def publish(self, key, value, published_at=None):
+        entry = (value, time.time() if published_at is None else published_at)
+        with self._lock:
+            self._entries[key] = entry
+            self._failures.pop(key, None)
+        return entry
+
+    def invalidate(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+            self._failures.pop(key, None)
+
+    def _record_failure(self, key, error):
+        with self._lock:
+            self._failures[key] = (str(error) or error.__class__.__name__, time.time())
+
+    def status(self, key):
+        """Freshness of a key: published_at, age, last_error and a stale flag for UI markers"""
+        with self._lock:
+            entry = self._entries.get(key)
+            failure = self._failures.get(key)
+            ttl = self._ttls.get(key)
+        if entry is None:
+            return {'published_at': None, 'age': None, 'last_error': failure and failure[0], 'stale': True}
+        age = time.time() - entry[1]
+        return {
+            'published_at': entry[1] or None,
+            'age': age,
+            'last_error': failure and failure[0],
+            'stale': failure is not None or (ttl is not None and age > ttl)
+        }
+
+    def get_or_refresh(self, key, ttl, fetch, refresh_ahead=None):
+        """
+        Serve the entry while it is younger than ttl, otherwise call fetch() and publish the result.
+        Only one session refreshes a given key at a time; the others wait and reuse its result,
+        so provider traffic stays constant however many sessions are connected.
+        With refresh_ahead (a fraction of ttl), an entry past that age is still served but
+        refreshed in the background so it is replaced before it expires.
+        """
+        entry = self.get(key, ttl)
+        if entry is not None:
+            if refresh_ahead is not None and time.time() - entry[1] > ttl * refresh_ahead:
+                self.refresh_in_background(key, fetch)
+            return entry
+        with self._refresh_lock(key):
+            entry = self.get(key, ttl)
+            if entry is not None:
+                return entry
+            return self.publish(key, fetch())
+
+    def get_stale_while_revalidate(self, key, ttl, fetch, fallback=None, refresh_ahead=None):
+        """
+        Serve the last good value immediately. Once it is older than ttl (or ttl * refresh_ahead)
+        it is refreshed on a background thread; if that refresh fails the old value keeps being
+        served and status(key) reports it as stale. Only a missing key is fetched synchronously,
+        and if that fails the fallback() value is published already expired so the next read retries.
+        """
+        with self._lock:
+            self._ttls[key] = ttl
+        entry = self.get(key)
+        if entry is None:
+            with self._refresh_lock(key):
+                entry = self.get(key)
+                if entry is None:
+                    try:
+                        return self.publish(key, fetch())
+                    except Exception as e:
+                        if fallback is None:
+                            raise
+                        entry = self.publish(key, fallback(), published_at=0)
+                        self._record_failure(key, e)
+                        return entry
+        age = time.time() - entry[1]
+        if age > ttl or (refresh_ahead is not None and age > ttl * refresh_ahead):
+            self.refresh_in_background(key, fetch)
+        return entry
+
+    def refresh(self, key, fetch):
+        """Unconditionally refetch and publish, serialized with get_or_refresh() on the same key"""
+        with self._refresh_lock(key):
+            try:
+                return self.publish(key, fetch())
+            except Exception as e:
+                self._record_failure(key, e)
+                raise
+
+    def refresh_in_background(self, key, fetch):
+        """Refresh on a daemon thread unless a refresh of this key is already in flight"""
+        refresh_lock = self._refresh_lock(key)
+        if not refresh_lock.acquire(blocking=False):
+            return False
+
+        def run():
+            try:
+                self.publish(key, fetch())
+            except Exception as e:
+                self._record_failure(key, e)
+            finally:
+                refresh_lock.release()
+
+        threading.Thread(target=run, name=f"refresh-{key}", daemon=True).start()
+        return True
+
+    def _refresh_lock(self, key):
+        with self._lock:
+            return self._refresh_locks[key]
+
+
+@st.cache_resource
+def get_shared_data_store():
+    return SharedDataStore()
+
+
+def stale_while_revalidate(key, ttl, fallback=None, refresh_ahead=None):
+    """
+    Method decorator caching the result process-wide under `key` with stale-while-revalidate
+    semantics (see SharedDataStore.get_stale_while_revalidate). The wrapped method should raise
+    when no provider delivered data; `fallback(self)` supplies the value for a cold failure.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self):
+            return self.resources.store.get_stale_while_revalidate(
+                key, ttl, lambda: method(self),
+                fallback=(lambda: fallback(self)) if fallback is not None else None,
+                refresh_ahead=refresh_ahead)[0]
+        return wrapper
+    return decorator
+
+
+# ---------------------------
+# PriceHistoryStore: Persistent Time-series of Price Ticks
+# ---------------------------
+class PriceHistoryStore:
+    """Append-only SQLite (WAL) store of price ticks, read back by point count (ring-buffer seeding, exports)"""
+
+    def __init__(self, path, retention_days=PRICE_HISTORY_RETENTION_DAYS):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.retention_days = retention_days
+        self._lock = threading.Lock()
+        self._last_prune = 0.0
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS price_ticks (
+                company TEXT NOT NULL,
+                ts INTEGER NOT NULL,  -- epoch milliseconds
+                price REAL NOT NULL,
+                source TEXT NOT NULL,
+                PRIMARY KEY (company, ts)
+            ) WITHOUT ROWID
+        """)
+        self._conn.commit()
+
+    def append(self, quotes, timestamp=None):
+        """Record one tick per company; quotes maps company -> (price, source)"""
+        ts = int((timestamp if timestamp is not None else time.time()) * 1000)
+        rows = [(company, ts, float(price), src) for company, (price, src) in quotes.items()]
+        with self._lock:
+            self._conn.executemany("INSERT OR IGNORE INTO price_ticks VALUES (?, ?, ?, ?)", rows)
+            # Prune expired ticks at most once an hour
+            if self.retention_days and time.time() - self._last_prune > 3600:
+                cutoff = int((time.time() - self.retention_days * 86400) * 1000)
+                self._conn.execute("DELETE FROM price_ticks WHERE ts < ?", (cutoff,))
+                self._last_prune = time.time()
+            self._conn.commit()
+
+    def rows(self, company, limit=None):
+        """Raw (epoch ms, price, source) tuples of one company's last `limit` ticks, in ascending time order"""
+        query = "SELECT ts, price, source FROM price_ticks WHERE company = ? ORDER BY ts DESC"
+        params = [company]
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(int(limit))
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        rows.reverse()
+        return rows
+
+    def iter_chunks(self, companies, limit=None, chunk_size=EXPORT_CHUNK_ROWS):
+        """
+        Stream (company, rows) chunks of raw (epoch ms, price, source) tuples, in ascending time order
+        per company, optionally only each company's last `limit` ticks. Uses its own read connection
+        (WAL readers don't block the writer), so long exports never hold the store lock.
+        """
+        conn = sqlite3.connect(self.path)
+        try:
+            for company in companies:
+                query = "SELECT ts, price, source FROM price_ticks WHERE company = ?"
+                params = [company]
+                if limit is not None:
+                    # Lower time bound = timestamp of the limit-th newest tick (all ticks if there are fewer)
+                    query += (" AND ts >= COALESCE((SELECT ts FROM price_ticks WHERE company = ?"
+                              " ORDER BY ts DESC LIMIT 1 OFFSET ?), 0)")
+                    params += [company, int(limit) - 1]
+                cursor = conn.execute(query + " ORDER BY ts", params)
+                while True:
+                    rows = cursor.fetchmany(chunk_size)
+                    if not rows:
+                        break
+                    yield company, rows
+        finally:
+            conn.close()
+
+
+@st.cache_resource
+def get_price_history_store():
+    return PriceHistoryStore(PRICE_HISTORY_DB)
+
+
+# ---------------------------
+# PriceRingBuffer: In-memory Columnar Tick Windows
+# ---------------------------
+PriceWindow = namedtuple('PriceWindow', ['timestamps', 'prices', 'sources'])  # int64 ms, float64, uint8 code
+
+
+class PriceRingBuffer:
+    """Fixed-capacity columnar tick buffer for one company with O(1) append and contiguous window slices"""
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        # Every tick is written twice (at i and i + capacity) so any window is one contiguous slice
+        self._timestamps = np.zeros(2 * capacity, dtype=np.int64)
+        self._prices = np.zeros(2 * capacity, dtype=np.float64)
+        self._sources = np.zeros(2 * capacity, dtype=np.uint8)
+        self._head = 0  # Next write position in [0, capacity)
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def append(self, timestamp_ms, price, source_code):
+        for i in (self._head, self._head + self.capacity):
+            self._timestamps[i] = timestamp_ms
+            self._prices[i] = price
+            self._sources[i] = source_code
+        self._head = (self._head + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+
+    def window(self, n=None):
+        """
+        Copies of the last n ticks, oldest first. The caller must hold the owner's lock; copying
+        inside it keeps a later append from overwriting a window while it is being read.
+        """
+        n = self._size if n is None else max(0, min(int(n), self._size))
+        end = self._head + self.capacity
+        return PriceWindow(self._timestamps[end - n:end].copy(), self._prices[end - n:end].copy(),
+                           self._sources[end - n:end].copy())
+
+
+class PriceRingBuffers:
+    """Process-wide ring buffers per company, seeded from the persistent history on first use"""
+
+    def __init__(self, history, capacity=PRICE_RING_CAPACITY):
+        self.history = history
+        self.capacity = capacity
+        self.source_names = []  # uint8 code -> provider name
+        self._source_codes = {}
+        self._buffers = {}
+        self._lock = threading.Lock()
+
+    def _source_code(self, name):
+        code = self._source_codes.get(name)
+        if code is None:
+            code = len(self.source_names)
+            if code > np.iinfo(np.uint8).max:
+                raise ValueError("Too many distinct data sources for a uint8 source code")
+            self.source_names.append(name)
+            self._source_codes[name] = code
+        return code
+
+    def _buffer(self, company):
+        buffer = self._buffers.get(company)
+        if buffer is None:
+            buffer = PriceRingBuffer(self.capacity)
+            for ts, price, src in self.history.rows(company, limit=self.capacity):
+                buffer.append(ts, price, self._source_code(src))
+            self._buffers[company] = buffer
+        return buffer
+
+    def append(self, quotes, timestamp_ms):
+        with self._lock:
+            for company, (price, src) in quotes.items():
+                self._buffer(company).append(timestamp_ms, price, self._source_code(src))
+
+    def windows(self, companies, n):
+        with self._lock:
+            return {company: self._buffer(company).window(n) for company in companies}
+
+
+@st.cache_resource
+def get_price_ring_buffers():
+    return PriceRingBuffers(get_price_history_store())
+
+
+def to_local_datetimes(timestamps_ms):
+    """Epoch-millisecond array -> naive local datetime64[ms] array for chart axes and exports"""
+    # Each tick takes the local UTC offset in force at its own time (so history across a DST change lines up),
+    # looked up once per distinct hour since offsets only change on hour boundaries
+    timestamps_ms = np.asarray(timestamps_ms, dtype=np.int64)
+    hours, inverse = np.unique(timestamps_ms // 3600000, return_inverse=True)
+    offsets_ms = np.array([time.localtime(h * 3600).tm_gmtoff for h in hours.tolist()], dtype=np.int64) * 1000
+    return (timestamps_ms + offsets_ms[inverse.reshape(timestamps_ms.shape)]).astype('datetime64[ms]')
+
+
+# ---------------------------
+# Price Export: Chunked CSV / gzip CSV / Parquet from the Price Store
+# ---------------------------
+EXPORT_FORMATS = {
+    # label: (file extension, MIME type)
+    'CSV': ('csv', 'text/csv'),
+    'CSV (gzip)': ('csv.gz', 'application/gzip'),
+    'Parquet': ('parquet', 'application/vnd.apache.parquet'),
+}
+
+
+def available_export_formats():
+    return [label for label in EXPORT_FORMATS if label != 'Parquet' or pq is not None]
+
+
+def iter_export_frames(store, companies, market_caps, limit=None, chunk_size=EXPORT_CHUNK_ROWS):
+    """
+    Export rows as DataFrame chunks with change columns computed per chunk, vectorized; the previous
+    price is carried across chunk boundaries so chunking does not change the result.
+    """
+    previous = {}
+    for company, rows in store.iter_chunks(companies, limit, chunk_size):
+        chunk = pd.DataFrame.from_records(rows, columns=['ts', 'price', 'source'])
+        prices = chunk['price'].to_numpy(dtype=float)
+        prev_p = np.concatenate(([previous.get(company, prices[0])], prices[:-1]))
+        change = prices - prev_p
+        previous[company] = prices[-1]
+        yield pd.DataFrame({
+            'company': company,
+            'timestamp': np.datetime_as_string(to_local_datetimes(chunk['ts'].to_numpy()), unit='ms'),
+            'price': prices,
+            'change': change,
+            'percent_change': np.divide(change * 100.0, prev_p, out=np.zeros(len(prices)), where=prev_p != 0),
+            'market_cap_billion_usd': float(market_caps.get(company, 0.0)),
+            'data_source': chunk['source'].to_numpy()
+        })
+
+
+def write_export(frames, path, fmt):
+    """Write export chunks to `path` one at a time (constant memory); returns the number of rows"""
+    total = 0
+    if fmt == 'Parquet':
+        writer = None
+        try:
+            for frame in frames:
+                table = pa.Table.from_pandas(frame, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(path, table.schema, compression='snappy')
+                writer.write_table(table)  # One row group per chunk
+                total += len(frame)
+        finally:
+            if writer is not None:
+                writer.close()
+        return total
+
+    opener = gzip.open if fmt == 'CSV (gzip)' else open
+    with opener(path, 'wt', encoding='utf-8', newline='') as f:
+        for frame in frames:
+            frame.to_csv(f, index=False, header=(total == 0))
+            total += len(frame)
+    return total
+
+
+def export_price_history(companies, market_caps, fmt, limit=None):
+    """Export price history to a temporary file; returns (path, row count). The caller removes the file."""
+    extension, _ = EXPORT_FORMATS[fmt]
+    fd, path = tempfile.mkstemp(suffix=f".{extension}", prefix="price_export_")
+    os.close(fd)
+    try:
+        frames = iter_export_frames(get_price_history_store(), companies, market_caps, limit)
+        return path, write_export(frames, path, fmt)
+    except Exception:
+        os.remove(path)
+        raise
+
+
+# ---------------------------
+# FeedCache: Conditional GET State for Journal RSS Feeds
+# ---------------------------
+class FeedCache:
+    """Per-feed ETag / Last-Modified validators and the entries kept from the last full download"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._feeds = {}  # url -> {'etag', 'last_modified', 'entries'}
+
+    def get(self, url):
+        with self._lock:
+            return self._feeds.get(url)
+
+    def put(self, url, etag, last_modified, entries):
+        with self._lock:
+            self._feeds[url] = {'etag': etag, 'last_modified': last_modified, 'entries': entries}
+
+
+@st.cache_resource
+def get_feed_cache():
+    return FeedCache()
+
+
+def _feed_entry(elem):
+    """Map an RSS <item> / Atom <entry> element to the fields used by the news tab"""
+    fields = {}
+    for child in elem:
+        name = child.tag.rsplit('}', 1)[-1]
+        if name == 'link' and child.get('href'):
+            # Atom links carry the URL in href; prefer the alternate (HTML) link
+            if child.get('rel', 'alternate') == 'alternate' or 'link' not in fields:
+                fields['link'] = child.get('href')
+        elif name not in fields:
+            fields[name] = ''.join(child.itertext()).strip()
+    summary = fields.get('description') or fields.get('summary') or fields.get('content') or ''
+    return {
+        'title': fields.get('title', ''),
+        'link': fields.get('link', ''),
+        'published': fields.get('pubDate') or fields.get('published') or fields.get('updated') or fields.get('date', ''),
+        'summary': re.sub(r'<[^>]+>', '', summary).strip()
+    }
+
+
+def read_feed_head(response, limit):
+    """
+    Incrementally parse a streamed RSS/Atom response and stop reading once `limit` entries are
+    complete, so only the entries we keep are parsed (and usually only part of the body is downloaded).
+    Malformed feeds fall back to feedparser on the full body.
+    """
+    entries = []
+    received = []
+    parser = ET.XMLPullParser(events=('end',))
+    chunks = response.iter_content(chunk_size=16384)
+    try:
+        for chunk in chunks:
+            received.append(chunk)
+            parser.feed(chunk)
+            for _, elem in parser.read_events():
+                if elem.tag.rsplit('}', 1)[-1] in ('item', 'entry'):
+                    entries.append(_feed_entry(elem))
+                    elem.clear()
+                    if len(entries) >= limit:
+                        return entries
+        return entries
+    except ET.ParseError:
+        # The rest of the body comes from the same iterator, whether it streams or replays an already
+        # loaded body (e.g. after the fixture recorder read .content), so no part is parsed twice
+        parsed = feedparser.parse(b''.join(received) + b''.join(chunks))
+        return [{'title': e.get('title', ''), 'link': e.get('link', ''), 'published': e.get('published', ''),
+                 'summary': e.get('summary', '')} for e in parsed.entries[:limit]]
+    finally:
+        response.close()
+
+
+# ---------------------------
+# ClinicalTrialRepository: Indexed Trial Queries
+# ---------------------------
+class ClinicalTrialRepository:
+    """
+    Immutable set of clinical trials indexed by sponsor, phase and status. The index is built once
+    per load and maps every (sponsor, phase, status) key, with None as a wildcard for any field, to
+    the matching trials, so count() and filter() are a single dict lookup.
+    """
+    FIELDS = ('sponsor', 'phase', 'status')
+
+    def __init__(self, trials):
+        self._trials = tuple(trials)
+        index = defaultdict(list)
+        for trial in self._trials:
+            values = [(trial.get(field), None) for field in self.FIELDS]
+            for key in product(*values):
+                index[key].append(trial)
+        self._index = {key: tuple(matches) for key, matches in index.items()}
+
+    def __len__(self):
+        return len(self._trials)
+
+    def __iter__(self):
+        return iter(self._trials)
+
+    def filter(self, sponsor=None, phase=None, status=None):
+        """Trials matching every given field, in load order"""
+        return self._index.get((sponsor, phase, status), ())
+
+    def count(self, sponsor=None, phase=None, status=None):
+        return len(self.filter(sponsor, phase, status))
+
+    def values(self, field):
+        """Distinct values of `field` ('sponsor', 'phase' or 'status'), sorted"""
+        position = self.FIELDS.index(field)
+        return sorted({key[position] for key in self._index if key[position] is not None})
+
+
+@st.cache_resource
+def get_trial_store():
+    return TrialStore(CLINICAL_TRIALS_DB)
+
+
+# ---------------------------
+# BackgroundPoller: Refresh Data Independently of Page Rendering
+# ---------------------------
+class BackgroundPoller:
+    """
+    Daemon thread, started once per server process, that refreshes quotes on the sidebar's
+    refresh_rate schedule, and market caps and news once they are older than MARKET_DATA_TTL,
+    publishing them to the SharedDataStore.
+    Page runs then render from the latest published data instead of paying fetch latency.
+    Settings are process-wide: the most recent session to change them wins.
+    The thread runs outside any script run, so it fetches through its own data manager, bound to
+    explicit process-wide resources, and never touches session state or Streamlit's cache APIs.
+    """
+
+    def __init__(self, store, data_manager):
+        self.store = store
+        self.data_manager = data_manager
+        self.interval = 60
+        self.enabled = True
+        self.last_poll = None
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def configure(self, interval, enabled):
+        """Apply sidebar settings and make sure the polling thread is running"""
+        with self._lock:
+            changed = interval != self.interval or enabled != self.enabled
+            self.interval = interval
+            self.enabled = enabled
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="background-poller", daemon=True)
+                self._thread.start()
+        if changed:
+            self._wake.set()
+
+    def is_active(self):
+        return self.enabled and self._thread is not None and self._thread.is_alive()
+
+    def serving_ttl(self, default_ttl):
+        """While polling, published data stays valid until the next poll is overdue"""
+        if self.is_active():
+            return max(default_ttl, self.interval * 2)
+        return default_ttl
+
+    def poll_once(self):
+        data_manager = self.data_manager
+        for key, fetch, ttl in (('quotes', data_manager._fetch_and_record_quotes, None),
+                                ('market_caps', data_manager._fetch_market_caps, MARKET_DATA_TTL),
+                                ('news', data_manager._fetch_market_news, MARKET_DATA_TTL)):
+            # Market caps and news spend metered provider quota (FMP, GNews), so only refetch them once stale
+            if ttl is not None and self.store.get(key, ttl) is not None:
+                continue
+            try:
+                self.store.refresh(key, fetch)
+            except Exception:
+                continue
+        self.last_poll = datetime.now()
+
+    def _run(self):
+        while True:
+            if self.enabled:
+                self.poll_once()
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+
+@st.cache_resource
+def get_background_poller():
+    # Built inside a script run, where the resource getters and st.secrets are available
+    resources = get_data_resources()
+    return BackgroundPoller(resources.store, EnhancedDataManager(resources))
+
+
+# ---------------------------
+# Provider Client Layer: Pooled Sessions, Retries and Circuit Breakers
+# ---------------------------
+class ProviderUnavailable(RuntimeError):
+    """Raised instead of calling a provider whose circuit is open"""
+
+
+class QuotaExceeded(ProviderUnavailable):
+    """Raised instead of calling a provider whose rate limit or daily quota is spent"""
+
+
+class CircuitBreaker:
+    """
+    Closed → open after `failure_threshold` consecutive failures; while open every call is refused
+    for `cooldown` seconds, then a single probe call is let through (half-open) to decide whether
+    the circuit closes again or stays open for another cooldown.
+    """
+
+    def __init__(self, failure_threshold=BREAKER_FAILURE_THRESHOLD, cooldown=BREAKER_COOLDOWN):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._probe_in_flight = False
+
+    def allow(self):
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if self._probe_in_flight or time.time() - self._opened_at < self.cooldown:
+                return False
+            self._probe_in_flight = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._opened_at is not None or self._failures >= self.failure_threshold:
+                self._opened_at = time.time()
+            self._probe_in_flight = False
+
+    def release(self):
+        """An allowed call ended without a verdict (nothing was sent): let the next call probe instead"""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def status(self):
+        """('closed' | 'open' | 'half-open', seconds until the next probe)"""
+        with self._lock:
+            if self._opened_at is None:
+                return 'closed', 0.0
+            remaining = self.cooldown - (time.time() - self._opened_at)
+            return ('open', remaining) if remaining > 0 else ('half-open', 0.0)
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical fetches: while a call for a key is in flight, later callers with the
+    same key wait for it and share its result (or exception) instead of sending their own request.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}  # key -> Future of the in-flight call
+
+    def do(self, key, fn, *args, **kwargs):
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+        if not leader:
+            return future.result()
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+    def in_flight(self):
+        with self._lock:
+            return len(self._calls)
+
+
+class QuotaLedger:
+    """
+    Per-provider token bucket plus daily request counter, persisted in SQLite (WAL) so the budget is
+    shared by every session and survives restarts. acquire() never waits: when a provider's budget is
+    gone the caller moves on to the next provider in its chain.
+    """
+
+    def __init__(self, path, limits=PROVIDER_RATE_LIMITS):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.limits = limits
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS provider_budget (
+                provider TEXT PRIMARY KEY,
+                day TEXT NOT NULL,  -- UTC date the daily counter belongs to
+                used INTEGER NOT NULL,  -- requests spent on `day`
+                exhausted INTEGER NOT NULL,  -- the provider itself reported the day's quota as spent
+                tokens REAL NOT NULL,  -- token bucket level at updated_at
+                updated_at REAL NOT NULL  -- epoch seconds
+            ) WITHOUT ROWID
+        """)
+        self._conn.commit()
+
+    def _load(self, provider, now):
+        """[used today, exhausted, tokens] with the bucket refilled up to `now`; caller holds the lock"""
+        burst, per_seconds, _ = self.limits[provider]
+        today = time.strftime('%Y-%m-%d', time.gmtime(now))
+        row = self._conn.execute("SELECT day, used, exhausted, tokens, updated_at FROM provider_budget "
+                                 "WHERE provider = ?", (provider,)).fetchone()
+        if row is None:
+            return [0, 0, float(burst)]
+        day, used, exhausted, tokens, updated_at = row
+        if day != today:
+            used, exhausted = 0, 0
+        return [used, exhausted, min(float(burst), tokens + max(0.0, now - updated_at) * burst / per_seconds)]
+
+    def _store(self, provider, state, now):
+        used, exhausted, tokens = state
+        self._conn.execute("INSERT OR REPLACE INTO provider_budget VALUES (?, ?, ?, ?, ?, ?)",
+                           (provider, time.strftime('%Y-%m-%d', time.gmtime(now)), used, exhausted, tokens, now))
+        self._conn.commit()
+
+    def acquire(self, provider):
+        """Spend one request of the provider's budget; False when its bucket is empty or the day's quota is spent"""
+        if provider not in self.limits:
+            return True
+        now = time.time()
+        with self._lock:
+            used, exhausted, tokens = self._load(provider, now)
+            if exhausted or used >= self.limits[provider][2] or tokens < 1:
+                return False
+            self._store(provider, [used + 1, exhausted, tokens - 1], now)
+            return True
+
+    def report_throttled(self, provider, daily=False):
+        """The provider answered with a rate-limit notice: empty its bucket, and with daily=True its day's quota"""
+        if provider not in self.limits:
+            return
+        now = time.time()
+        with self._lock:
+            used, exhausted, _ = self._load(provider, now)
+            self._store(provider, [used, 1 if daily else exhausted, 0.0], now)
+
+    def remaining(self, provider):
+        """(requests left today, seconds until the bucket holds a token again)"""
+        burst, per_seconds, daily = self.limits[provider]
+        with self._lock:
+            used, exhausted, tokens = self._load(provider, time.time())
+        left = 0 if exhausted else max(0, daily - used)
+        return left, max(0.0, (1 - tokens) * per_seconds / burst)
+
+
+@st.cache_resource
+def get_quota_ledger():
+    return QuotaLedger(QUOTA_LEDGER_DB)
+
+
+class ProviderClient:
+    """
+    Process-wide HTTP client of one provider: a pooled keep-alive requests.Session, jittered
+    exponential-backoff retries on connection errors and 429/5xx answers, a circuit breaker that
+    makes calls to a failing provider fail fast for a cooldown, (for metered providers) a quota
+    ledger consulted before every request is sent, and single-flight coalescing of identical fetches.
+    """
+
+    def __init__(self, name, retries=HTTP_RETRIES, ledger=None, recorder=None):
+        self.name = name
+        self.retries = retries
+        self.ledger = ledger
+        self.recorder = recorder
+        self.breaker = CircuitBreaker()
+        self.flights = SingleFlight()
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=HTTP_POOL_MAXSIZE, max_retries=0)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def _backoff(self, attempt):
+        time.sleep(min(HTTP_BACKOFF_MAX, HTTP_BACKOFF_BASE * 2 ** attempt) * random.uniform(0.5, 1.5))
+
+    def get(self, url, **kwargs):
+        """
+        session.get with retries. Returns the response (callers still check its status); raises
+        ProviderUnavailable while the circuit is open, QuotaExceeded once the request budget is
+        spent, and the last error once retries are spent.
+        """
+        if not self.breaker.allow():
+            raise ProviderUnavailable(f"{self.name} circuit open")
+        target = rewrite_url(url, PROVIDER_BASE_URL) if PROVIDER_BASE_URL else url
+        try:
+            for attempt in range(self.retries + 1):
+                if self.ledger is not None and not self.ledger.acquire(self.name):
+                    raise QuotaExceeded(f"{self.name} request budget spent")
+                try:
+                    r = self.session.get(target, **kwargs)
+                except requests.Timeout:
+                    # A provider that did not answer in time is not retried; the caller's deadline is tight
+                    self.breaker.record_failure()
+                    raise
+                except requests.ConnectionError:
+                    if attempt == self.retries:
+                        self.breaker.record_failure()
+                        raise
+                except requests.RequestException:
+                    # Redirect loops, broken encodings, invalid URLs: another attempt would fail the same way
+                    self.breaker.record_failure()
+                    raise
+                else:
+                    if self.recorder is not None and r.status_code != 304:  # A 304 only makes sense with our feed cache
+                        self._record(url, r)
+                    if r.status_code == 429 and self.ledger is not None:
+                        # A metered provider's 429 means its budget is gone; retrying would only spend more of it
+                        self.ledger.report_throttled(self.name)
+                        self.breaker.release()
+                        return r
+                    if r.status_code not in HTTP_RETRY_STATUSES:
+                        self.breaker.record_success()
+                        return r
+                    if attempt == self.retries:
+                        self.breaker.record_failure()
+                        return r
+                    r.close()
+                self._backoff(attempt)
+        except BaseException:
+            # Whatever escaped (quota, an unexpected error), never leave a half-open probe slot taken
+            self.breaker.release()
+            raise
+
+    def _record(self, url, r):
+        # Fixtures are a benchmarking aid: failing to write one must never fail the provider call
+        try:
+            self.recorder.save_response(url, r)
+        except Exception:
+            pass
+
+    def single_flight(self, key, fn, *args, **kwargs):
+        """
+        Run fn(*args, **kwargs) for `key` (symbol or endpoint) unless the same fetch is already in flight
+        on this provider, in which case wait for that one and share its result. fn returns parsed data,
+        never a Response, since a response body can only be read once.
+        """
+        return self.flights.do(key, fn, *args, **kwargs)
+
+    def call(self, fn, *args, **kwargs):
+        """Guard a non-HTTP provider call (e.g. yfinance) with the breaker; an exception counts as a failure"""
+        if not self.breaker.allow():
+            raise ProviderUnavailable(f"{self.name} circuit open")
+        try:
+            result = fn(*args, **kwargs)
+        except Exception:
+            self.breaker.record_failure()
+            raise
+        self.breaker.record_success()
+        return result
+
+
+class ProviderClients:
+    def __init__(self, ledger):
+        self.ledger = ledger
+        self._clients = {}
+        self._lock = threading.Lock()
+
+    def get(self, name):
+        with self._lock:
+            if name not in self._clients:
+                ledger = self.ledger if name in PROVIDER_RATE_LIMITS else None
+                recorder = FixtureStore(PROVIDER_RECORD_DIR) if PROVIDER_RECORD_DIR else None
+                self._clients[name] = ProviderClient(name, ledger=ledger, recorder=recorder)
+            return self._clients[name]
+
+    def statuses(self):
+        with self._lock:
+            return {name: client.breaker.status() for name, client in self._clients.items()}
+
+
+@st.cache_resource
+def get_provider_clients():
+    return ProviderClients(get_quota_ledger())
+
+
+# ---------------------------
+# Provider Registry: Ordered, Hedged and Measured Data Sources
+# ---------------------------
+class ProviderMiss(RuntimeError):
+    """A provider answered without usable data, or no provider of a kind answered"""
+
+
+class ProviderMetrics:
+    """Process-wide call count, success rate and latency of every (kind, provider) pair"""
+
+    def __init__(self, window=PROVIDER_METRICS_WINDOW):
+        self._lock = threading.Lock()
+        self._recent = defaultdict(lambda: deque(maxlen=window))  # (kind, name) -> (latency seconds, ok)
+        self._totals = defaultdict(lambda: [0, 0])  # (kind, name) -> [calls, successes]
+
+    def record(self, kind, name, latency, ok):
+        with self._lock:
+            self._recent[kind, name].append((latency, ok))
+            totals = self._totals[kind, name]
+            totals[0] += 1
+            totals[1] += ok
+
+    def snapshot(self):
+        """One row per (kind, provider): lifetime calls and success rate, p50/p95 latency of recent calls"""
+        with self._lock:
+            items = [(key, list(self._recent[key]), tuple(self._totals[key])) for key in sorted(self._recent)]
+        rows = []
+        for (kind, name), recent, (calls, successes) in items:
+            latencies = np.array([latency for latency, _ in recent]) * 1000
+            rows.append({
+                'kind': kind, 'provider': name, 'calls': calls,
+                'success_rate': successes / calls,
+                'p50_ms': float(np.percentile(latencies, 50)),
+                'p95_ms': float(np.percentile(latencies, 95)),
+            })
+        return rows
+
+
+@st.cache_resource
+def get_provider_metrics():
+    return ProviderMetrics()
+
+
+@st.cache_resource
+def get_provider_executor():
+    # Shared by every registry, so a hedged loser keeps running here without blocking its caller
+    return ThreadPoolExecutor(max_workers=PROVIDER_MAX_WORKERS, thread_name_prefix="provider")
+
+
+class ProviderRegistry:
+    """
+    Data sources per kind ('quote', 'market_cap', 'news') in priority order. A source is a blocking
+    fetch(*args) returning a value, or None / an exception when it has nothing; the registry runs them
+    through one async interface on a shared thread pool, records per-provider metrics, and resolves a
+    request by ordered fallback or by racing the first two sources (hedged). Metered sources
+    (quota-limited, see PROVIDER_RATE_LIMITS) are never raced.
+    """
+
+    def __init__(self, metrics=None, executor=None):
+        self.metrics = metrics or get_provider_metrics()
+        self.executor = executor or get_provider_executor()
+        self._sources = defaultdict(OrderedDict)  # kind -> name -> fetch
+        self._metered = set()  # (kind, name) of sources whose every call spends request quota
+
+    def register(self, kind, name, fetch, metered=None):
+        """
+        Add (or replace) a source; new sources go last until reorder() moves them. metered defaults
+        to whether the provider has a request budget in PROVIDER_RATE_LIMITS.
+        """
+        self._sources[kind][name] = fetch
+        if metered is None:
+            metered = name in PROVIDER_RATE_LIMITS
+        (self._metered.add if metered else self._metered.discard)((kind, name))
+
+    def unregister(self, kind, name):
+        self._sources[kind].pop(name, None)
+
+    def reorder(self, kind, names):
+        """Put the named sources first, in the given order; the others keep their order behind them"""
+        for name in reversed(names):
+            if name in self._sources[kind]:
+                self._sources[kind].move_to_end(name, last=False)
+
+    def names(self, kind):
+        return list(self._sources[kind])
+
+    def _chain(self, kind, names=None):
+        return [name for name in self._sources[kind] if names is None or name in names]
+
+    def _timed_fetch(self, kind, name, args):
+        # Measured on the worker thread, so calls that lost a race or outlived their caller are counted too
+        started = time.perf_counter()
+        try:
+            value = self._sources[kind][name](*args)
+            if value is None:
+                raise ProviderMiss(f"{name} returned no {kind}")
+        except Exception:
+            self.metrics.record(kind, name, time.perf_counter() - started, False)
+            raise
+        self.metrics.record(kind, name, time.perf_counter() - started, True)
+        return value
+
+    async def fetch(self, kind, name, *args):
+        """One source's value; raises ProviderMiss (or the source's error) when it has none"""
+        return await asyncio.wrap_future(self.executor.submit(self._timed_fetch, kind, name, args))
+
+    async def first_available(self, kind, *args, names=None):
+        """Ordered fallback: (name, value) from the first source that answers"""
+        errors = []
+        for name in self._chain(kind, names):
+            try:
+                return name, await self.fetch(kind, name, *args)
+            except Exception as e:
+                errors.append(f"{name}: {e}")
+        raise ProviderMiss(f"No {kind} provider answered" + (f" ({'; '.join(errors)})" if errors else ""))
+
+    async def hedged(self, kind, *args, names=None):
+        """
+        Race the next two sources and take the first usable answer, moving down the chain while both fail.
+        Where either of the two is metered, the next source is tried alone instead.
+        """
+        chain = self._chain(kind, names)
+        errors = []
+        while chain:
+            pair = chain[:2]
+            if len(pair) < 2 or any((kind, name) in self._metered for name in pair):
+                name = chain.pop(0)
+                try:
+                    return name, await self.fetch(kind, name, *args)
+                except Exception as e:
+                    errors.append(f"{name}: {e}")
+                    continue
+            racers = {asyncio.ensure_future(self.fetch(kind, name, *args)): name for name in pair}
+            pending = set(racers)
+            try:
+                while pending:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        if task.exception() is None:
+                            return racers[task], task.result()
+                        errors.append(f"{racers[task]}: {task.exception()}")
+            finally:
+                for task in pending:
+                    task.cancel()
+            chain = chain[2:]
+        raise ProviderMiss(f"No {kind} provider answered" + (f" ({'; '.join(errors)})" if errors else ""))
+
+    def resolve(self, kind, *args, mode='fallback', names=None):
+        """Blocking entry point for script and fetch threads: (provider name, value)"""
+        strategy = self.hedged if mode == 'hedged' else self.first_available
+        return asyncio.run(strategy(kind, *args, names=names))
+
+
+# Process-wide collaborators of the fetch paths, handed to EnhancedDataManager explicitly so its fetches
+# also run outside a script run (BackgroundPoller, stale-while-revalidate refresh threads)
+DataResources = namedtuple('DataResources', ['store', 'quota_ledger', 'clients', 'metrics', 'executor',
+                                             'price_history', 'ring_buffers', 'feed_cache'])
+
+
+def get_data_resources():
+    """Collect the shared resources; call from a script run, like the st.cache_resource getters it uses"""
+    return DataResources(get_shared_data_store(), get_quota_ledger(), get_provider_clients(),
+                         get_provider_metrics(), get_provider_executor(), get_price_history_store(),
+                         get_price_ring_buffers(), get_feed_cache())
+
+
 # ---------------------------
 # EnhancedDataManager: Data Acquisition, Real-time Quotes & Market Cap
 # ---------------------------
 class EnhancedDataManager:
-    def __init__(self):
+    def __init__(self, resources=None):
+        self.resources = resources or get_data_resources()
+
         # API Key Configuration
         self.alpha_vantage_key = st.secrets.get("ALPHA_VANTAGE_KEY", "")
         self.news_api_key = st.secrets.get("NEWS_API_KEY", "")
@@ -241,44 +1418,81 @@ class EnhancedDataManager:
             'AstraZeneca': 140.0
         }
 
-        # Initialize trend cache
-        if 'stock_trends' not in st.session_state:
-            st.session_state.stock_trends = {c: [] for c in self.companies}
+        # Lead sponsor name fragments (lower case) identifying each company in ClinicalTrials.gov records
+        self.trial_sponsor_aliases = {
+            'Roche': ('roche', 'genentech', 'chugai'),
+            'Bayer': ('bayer',),
+            'Hengrui Medicine': ('hengrui',),
+            'BeiGene': ('beigene',),
+            'Merck': ('merck sharp', 'msd'),
+            'Novartis': ('novartis',),
+            'AstraZeneca': ('astrazeneca', 'medimmune')
+        }
 
-        # Initialize carousel index and timer
-        if 'carousel_index' not in st.session_state:
-            st.session_state.carousel_index = 0
-        if 'last_carousel_update' not in st.session_state:
-            st.session_state.last_carousel_update = datetime.now()
-        if 'animation_frame' not in st.session_state:
-            st.session_state.animation_frame = 0
+        # Run-scoped quote snapshot: one EnhancedDataManager is created per script run,
+        # so every consumer in this rerun reads the same (prices, sources) pair
+        self._quote_snapshot = None
+        self._score_matrices = {}
 
-    def get_stock_price(self, symbol):
-        # Alpha Vantage Priority (if configured)
+        # Per-symbol quote, market cap and news sources (batch requests run before them).
+        # yfinance keeps its own HTTP session, so Yahoo is left out when requests go to a stand-in server
+        self.providers = ProviderRegistry(self.resources.metrics, self.resources.executor)
         if self.alpha_vantage_key:
-            try:
-                url = f'https://www.alphavantage.co/query?function=GLOBAL_QUOTE&symbol={symbol}&apikey={self.alpha_vantage_key}'
-                r = requests.get(url, timeout=10)
-                r.raise_for_status()
-                data = r.json()
-                price_str = data.get("Global Quote", {}).get("05. price")
-                if price_str:
-                    return float(price_str), "Alpha Vantage"
-            except Exception:
-                pass
+            self.providers.register('quote', 'alpha_vantage', self._fetch_alpha_vantage_quote)
+        if not PROVIDER_BASE_URL:
+            self.providers.register('quote', 'yahoo', self._fetch_yahoo_quote)
+        if self.fmp_api_key:
+            self.providers.register('market_cap', 'fmp', self._fetch_fmp_market_cap)
+        if not PROVIDER_BASE_URL:
+            self.providers.register('market_cap', 'yahoo', self._fetch_yahoo_market_cap)
+        self.providers.register('news', 'gnews', self._fetch_gnews_articles)
+        self.providers.register('news', 'rss', lambda: self._fetch_rss_articles() or None)
+        for kind, order in PROVIDER_ORDER.items():
+            self.providers.reorder(kind, order)
+
+    def _http_client(self, provider):
+        """Shared client for `provider` ('alpha_vantage', 'fmp', 'gnews', 'yahoo', or a feed host name)"""
+        return self.resources.clients.get(provider)
+
+    def _alpha_vantage_json(self, r):
+        """
+        Decode an Alpha Vantage answer. Throttled keys get HTTP 200 with a "Note"/"Information" notice
+        instead of data: report it to the quota ledger and raise, so the caller moves to the next provider.
+        """
+        r.raise_for_status()
+        data = r.json()
+        notice = (data.get('Note') or data.get('Information') or '') if isinstance(data, dict) else ''
+        if notice and 'premium endpoint' not in notice.lower():
+            # "... 25 requests per day" spends the day; per-minute/per-second notices only empty the bucket
+            daily = 'per day' in notice.lower() and 'minute' not in notice.lower()
+            self.resources.quota_ledger.report_throttled('alpha_vantage', daily=daily)
+            raise QuotaExceeded(notice)
+        return data
+
+    # Sessions refreshing together share one in-flight request per (provider, symbol)
+    def _fetch_alpha_vantage_quote(self, symbol):
+        def fetch():
+            url = f'https://www.alphavantage.co/query?function=GLOBAL_QUOTE&symbol={symbol}&apikey={self.alpha_vantage_key}'
+            return self._alpha_vantage_json(self._http_client('alpha_vantage').get(url, timeout=10))
+
+        data = self._http_client('alpha_vantage').single_flight(('GLOBAL_QUOTE', symbol), fetch)
+        price_str = data.get("Global Quote", {}).get("05. price")
+        return float(price_str) if price_str else None
+
+    def _fetch_yahoo_quote(self, symbol):
+        client = self._http_client('yahoo')
+        hist = client.single_flight(('history', symbol), client.call, yf.Ticker(symbol).history, period="2d")
+        return None if hist.empty else float(hist['Close'].iloc[-1])
 
-        # yfinance Fallback
+    def get_stock_price(self, symbol):
+        """Per-symbol quote from the registry's 'quote' sources (Alpha Vantage, yfinance), else simulated"""
         try:
-            t = yf.Ticker(symbol)
-            hist = t.history(period="2d")
-            if not hist.empty:
-                return float(hist['Close'].iloc[-1]), "Yahoo Finance"
+            name, price = self.providers.resolve('quote', symbol, mode=PROVIDER_MODES['quote'])
+            return price, PROVIDER_LABELS[name]
         except Exception:
             pass
 
         # Simulation Fallback
-        base = {'Roche': 45, 'Bayer': 15.5, 'Hengrui Medicine': 35, 'BeiGene': 180, 'Merck': 120, 'Novartis': 95,
-                'AstraZeneca': 65}
         company = None
         for k, v in self.companies.items():
             if v == symbol:
@@ -286,135 +1500,397 @@ class EnhancedDataManager:
                 break
         if not company:
             company = list(self.companies.keys())[0]
+        return self._simulated_price(company)
+
+    def _simulated_price(self, company):
+        """Simulated quote used when every provider fails or misses the sweep deadline"""
+        base = {'Roche': 45, 'Bayer': 15.5, 'Hengrui Medicine': 35, 'BeiGene': 180, 'Merck': 120, 'Novartis': 95,
+                'AstraZeneca': 65}
         return base.get(company, 50) * (1 + random.uniform(-0.02, 0.02)), "Simulated Data"
 
-    def get_stock_prices(self):
-        """Fetch all company prices and update session state trends"""
+    def _fetch_alpha_vantage_bulk(self, companies):
+        """One REALTIME_BULK_QUOTES request for all symbols (premium keys only; free keys get a notice and no data)"""
+        quotes = {}
+        store = self.resources.store
+        # A free key is refused with a premium notice; don't spend one of its few requests per sweep on that
+        if not self.alpha_vantage_key or not companies or store.get('alpha_vantage_bulk_refused', max_age=86400):
+            return quotes
+        symbols = ",".join(companies.values())
+
+        def fetch():
+            url = f'https://www.alphavantage.co/query?function=REALTIME_BULK_QUOTES&symbol={symbols}&apikey={self.alpha_vantage_key}'
+            return self._alpha_vantage_json(self._http_client('alpha_vantage').get(url, timeout=10))
+
+        try:
+            data = self._http_client('alpha_vantage').single_flight(('REALTIME_BULK_QUOTES', symbols), fetch)
+            if 'premium endpoint' in str(data.get('Information', '')).lower():
+                store.publish('alpha_vantage_bulk_refused', True)
+            by_symbol = {row.get('symbol'): row for row in data.get('data', []) if isinstance(row, dict)}
+            for company, symbol in companies.items():
+                price_str = by_symbol.get(symbol, {}).get('close')
+                if price_str:
+                    quotes[company] = (float(price_str), "Alpha Vantage")
+        except Exception:
+            pass
+        return quotes
+
+    def _fetch_yahoo_batch(self, companies):
+        """
+        One yf.download() call for all symbols, split back per company. Yahoo has no multi-symbol
+        quote endpoint here: yfinance requests each symbol itself, on its own threads.
+        """
+        if not companies or PROVIDER_BASE_URL:
+            return {}
+
+        def download():
+            # yfinance reports failures as an empty result, so an empty batch counts as a provider failure
+            quotes = {}
+            hist = yf.download(list(companies.values()), period="2d", group_by="ticker", progress=False,
+                               threads=True, auto_adjust=False, timeout=10)
+            if hist is None or hist.empty:
+                raise RuntimeError("Yahoo batch download returned no data")
+            for company, symbol in companies.items():
+                try:
+                    if isinstance(hist.columns, pd.MultiIndex):
+                        closes = hist[symbol]['Close'].dropna()
+                    else:
+                        closes = hist['Close'].dropna()
+                    if not closes.empty:
+                        quotes[company] = (float(closes.iloc[-1]), "Yahoo Finance")
+                except KeyError:
+                    continue
+            if not quotes:
+                raise RuntimeError("Yahoo batch download returned no quotes")
+            return quotes
+
+        try:
+            client = self._http_client('yahoo')
+            return client.single_flight(('download', tuple(companies.items())), client.call, download)
+        except Exception:
+            return {}
+
+    def _fetch_quotes_concurrently(self, companies, timeout=QUOTE_FETCH_DEADLINE, executor=None):
+        """
+        Fetch every symbol in parallel on a bounded thread pool.
+        Symbols that have not answered within the timeout fall back to simulated data,
+        so one sweep costs the slowest single provider chain instead of the sum of all of them.
+        """
+        if not companies:
+            return {}
+        own_executor = executor is None
+        if own_executor:
+            executor = ThreadPoolExecutor(max_workers=max(1, min(QUOTE_FETCH_MAX_WORKERS, len(companies))),
+                                          thread_name_prefix="quote-fetch")
+        futures = {company: executor.submit(self.get_stock_price, symbol)
+                   for company, symbol in companies.items()}
+        done, _ = wait(futures.values(), timeout=max(0.0, timeout))
+        if own_executor:
+            # Do not block on stragglers: they finish in the background and their results are discarded
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        quotes = {}
+        for company, future in futures.items():
+            if future in done and future.exception() is None:
+                quotes[company] = future.result()
+            else:
+                quotes[company] = self._simulated_price(company)
+        return quotes
+
+    def _fetch_quotes(self):
+        """
+        Quote sweep bounded by QUOTE_FETCH_DEADLINE: the whole-watchlist batch stages (Alpha Vantage
+        bulk, Yahoo download) run side by side for at most QUOTE_BATCH_DEADLINE, then the concurrent
+        per-symbol chain covers the symbols they did not resolve in the time that is left.
+        """
+        started = time.time()
+        executor = ThreadPoolExecutor(max_workers=QUOTE_FETCH_MAX_WORKERS + 2,  # + the two batch stages
+                                      thread_name_prefix="quote-fetch")
+        try:
+            # Alpha Vantage bulk answers take precedence, so its results are applied last
+            stages = [executor.submit(self._fetch_yahoo_batch, self.companies),
+                      executor.submit(self._fetch_alpha_vantage_bulk, self.companies)]
+            done, _ = wait(stages, timeout=QUOTE_BATCH_DEADLINE)
+            quotes = {}
+            for stage in stages:
+                if stage in done and stage.exception() is None:
+                    quotes.update(stage.result())
+            remaining = {c: s for c, s in self.companies.items() if c not in quotes}
+            quotes.update(self._fetch_quotes_concurrently(
+                remaining, QUOTE_FETCH_DEADLINE - (time.time() - started), executor=executor))
+        finally:
+            # Do not block on stragglers: they finish in the background and their results are discarded
+            executor.shutdown(wait=False, cancel_futures=True)
+        return quotes
+
+    def _fetch_and_record_quotes(self):
+        """Quote sweep whose result is also appended to the persistent history and the in-memory ring buffers"""
+        quotes = self._fetch_quotes()
+        now = time.time()
+        self.resources.price_history.append(quotes, now)
+        self.resources.ring_buffers.append(quotes, int(now * 1000))
+        return quotes
+
+    def _take_quote_snapshot(self):
+        """Read the process-wide quote snapshot, refetching it when older than QUOTE_CACHE_TTL"""
+        quotes, _ = self.resources.store.get_or_refresh(
+            'quotes', get_background_poller().serving_ttl(QUOTE_CACHE_TTL), self._fetch_and_record_quotes)
         prices = {}
         sources = {}
-        now = datetime.now()
-        for company, symbol in self.companies.items():
-            price, src = self.get_stock_price(symbol)
+        for company in self.companies:
+            price, src = quotes.get(company) or self._simulated_price(company)
             prices[company] = price
             sources[company] = src
-            trend = st.session_state.stock_trends[company]
-            trend.append({'timestamp': now, 'price': price, 'source': src})
-            # Keep last 100 data points
-            if len(trend) > 100:
-                st.session_state.stock_trends[company] = trend[-100:]
         return prices, sources
 
-    # Try to get market cap using FMP (Priority)
-    @st.cache_data(ttl=900)
-    def get_market_caps(_self):
+    def get_stock_prices(self):
+        """Return this rerun's quote snapshot; the network sweep happens on the first call only"""
+        if self._quote_snapshot is None:
+            self._quote_snapshot = self._take_quote_snapshot()
+        prices, sources = self._quote_snapshot
+        return dict(prices), dict(sources)
+
+    def get_price_windows(self, past_points):
+        """PriceWindow snapshots of the last `past_points` ticks per company"""
+        self.get_stock_prices()  # Make sure this run's snapshot is recorded first
+        return self.resources.ring_buffers.windows(self.companies, past_points)
+
+    def _fetch_fmp_market_caps_batch(self, companies):
         """
-        Return market cap for each company (in billions USD), priority to FMP (FinancialModelingPrep)
+        One FMP /quote request for the whole watchlist (marketCap is part of the quote payload).
+        Returns (caps, available); available is False when the multi-symbol endpoint could not be used.
         """
         caps = {}
-        fmp_key = _self.fmp_api_key
+        if not self.fmp_api_key or not companies:
+            return caps, False
+        symbols = ",".join(companies.values())
 
-        for company, symbol in _self.companies.items():
-            mc_billion = None
+        def fetch():
+            url = f"https://financialmodelingprep.com/api/v3/quote/{symbols}?apikey={self.fmp_api_key}"
+            r = self._http_client('fmp').get(url, timeout=8)
+            return self._fmp_json(r) if r.status_code == 200 else None
 
-            # 1) FMP Query (if key available)
-            if fmp_key:
-                try:
-                    fmp_symbol = symbol
-                    fmp_url = f"https://financialmodelingprep.com/api/v3/market-capitalization/{fmp_symbol}?apikey={fmp_key}"
-                    r = requests.get(fmp_url, timeout=8)
-                    if r.status_code == 200:
-                        data = r.json()
-                        if isinstance(data, list) and len(data) > 0:
-                            first = data[0]
-                            mc = None
-                            if isinstance(first, dict):
-                                mc = first.get('marketCap') or first.get('market_cap') or first.get('marketcap')
-                            if mc and isinstance(mc, (int, float)):
-                                mc_billion = mc / 1e9
-                except Exception:
-                    mc_billion = None
-
-            # 2) yfinance Attempt
-            if mc_billion is None:
-                try:
-                    t = yf.Ticker(symbol)
-                    info = t.info
-                    mc = info.get('marketCap')
-                    if mc and isinstance(mc, (int, float)):
-                        mc_billion = mc / 1e9
-                except Exception:
-                    mc_billion = None
-
-            # 3) Fallback Market Cap
-            if mc_billion is None:
-                mc_billion = _self.fallback_market_caps.get(company, 10.0)
+        try:
+            data = self._http_client('fmp').single_flight(('quote', symbols), fetch)
+            if not isinstance(data, list):
+                return caps, False
+            by_symbol = {row.get('symbol'): row for row in data if isinstance(row, dict)}
+            for company, symbol in companies.items():
+                mc = by_symbol.get(symbol, {}).get('marketCap')
+                if mc and isinstance(mc, (int, float)):
+                    caps[company] = mc / 1e9
+        except Exception:
+            return caps, False
+        return caps, True
+
+    def _fmp_json(self, r):
+        """Decode an FMP answer; an exhausted key gets {"Error Message": "Limit Reach ..."} instead of data"""
+        data = r.json()
+        if isinstance(data, dict) and 'limit reach' in str(data.get('Error Message', '')).lower():
+            self.resources.quota_ledger.report_throttled('fmp', daily=True)
+            raise QuotaExceeded(data['Error Message'])
+        return data
+
+    def _fetch_fmp_market_cap(self, symbol):
+        def fetch():
+            fmp_url = f"https://financialmodelingprep.com/api/v3/market-capitalization/{symbol}?apikey={self.fmp_api_key}"
+            r = self._http_client('fmp').get(fmp_url, timeout=8)
+            return self._fmp_json(r) if r.status_code == 200 else None
+
+        data = self._http_client('fmp').single_flight(('market-capitalization', symbol), fetch)
+        if isinstance(data, list) and len(data) > 0:
+            first = data[0]
+            mc = None
+            if isinstance(first, dict):
+                mc = first.get('marketCap') or first.get('market_cap') or first.get('marketcap')
+            if mc and isinstance(mc, (int, float)):
+                return mc / 1e9
+        return None
+
+    def _fetch_yahoo_market_cap(self, symbol):
+        client = self._http_client('yahoo')
+        info = client.single_flight(('info', symbol), client.call, lambda: yf.Ticker(symbol).info)
+        mc = info.get('marketCap')
+        return mc / 1e9 if mc and isinstance(mc, (int, float)) else None
+
+    def _fetch_market_cap(self, symbol, use_fmp=True):
+        """Per-company chain over the registry's 'market_cap' sources (FMP → yfinance info); None when all fail"""
+        names = None if use_fmp else [name for name in self.providers.names('market_cap') if name != 'fmp']
+        try:
+            return self.providers.resolve('market_cap', symbol, mode=PROVIDER_MODES['market_cap'], names=names)[1]
+        except Exception:
+            return None
 
+    # Try to get market cap using FMP (Priority)
+    def _fetch_market_caps(self):
+        """
+        Return market cap for each company (in billions USD), priority to FMP (FinancialModelingPrep).
+        One FMP multi-symbol request first, then the per-company chain for the rest runs concurrently.
+        """
+        found, fmp_batch_available = self._fetch_fmp_market_caps_batch(self.companies)
+        remaining = {c: s for c, s in self.companies.items() if c not in found}
+
+        if remaining:
+            # Symbols the batch endpoint already answered for won't do better on the single-symbol one
+            use_fmp = not fmp_batch_available
+            executor = ThreadPoolExecutor(max_workers=max(1, min(MARKET_CAP_FETCH_MAX_WORKERS, len(remaining))),
+                                          thread_name_prefix="market-cap-fetch")
+            futures = {company: executor.submit(self._fetch_market_cap, symbol, use_fmp)
+                       for company, symbol in remaining.items()}
+            done, _ = wait(futures.values(), timeout=MARKET_CAP_FETCH_DEADLINE)
+            executor.shutdown(wait=False, cancel_futures=True)
+            for company, future in futures.items():
+                if future in done and future.exception() is None and future.result() is not None:
+                    found[company] = future.result()
+
+        if not found:
+            raise RuntimeError("No market cap provider answered")
+
+        # 3) Fallback Market Cap (keep watchlist order, charts zip caps with prices)
+        caps = {}
+        for company in self.companies:
+            mc_billion = found.get(company)
+            if mc_billion is None:
+                mc_billion = self.fallback_market_caps.get(company, 10.0)
             caps[company] = float(mc_billion)
 
         return caps
 
+    def _fallback_market_caps(self):
+        return {company: float(self.fallback_market_caps.get(company, 10.0)) for company in self.companies}
+
     # Other Data Acquisition: News, Clinical Trials
-    @st.cache_data(ttl=900)
-    def get_market_news(_self):
-        articles = []
-        if not _self.news_api_key:
+    def _fetch_market_news(self):
+        """News from the registry's 'news' sources (GNews → journal RSS)"""
+        if not self.news_api_key:
             return {"total_articles": 0, "articles": []}
-        elif _self.news_api_key:
-            queries = ['"liver cancer" drug', 'hepatocellular carcinoma treatment', '肝癌 药物']
-            for q in queries[:2]:
-                try:
-                    url = f'https://gnews.io/api/v4/search?q={q}&lang=en&max=5&apikey={_self.news_api_key}'
-                    r = requests.get(url, timeout=10)
-                    r.raise_for_status()
-                    data = r.json()
-                    for a in data.get('articles', []):
-                        if not any(x['title'] == a['title'] for x in articles):
-                            articles.append({
-                                'title': a['title'],
-                                'url': a['url'],
-                                'source': a.get('source', {}).get('name', 'Unknown'),
-                                'published_at': a.get('publishedAt', ''),
-                                'description': (a.get('description', '')[:200] + '...') if a.get('description') else ''
-                            })
-                except Exception:
-                    continue
-        if not articles:
-            rss_sources = {
-                "Nature": "https://www.nature.com/nature.rss",
-                "Nature Medicine": "https://www.nature.com/nm.rss",
-                "Cancer Cell": "https://www.cell.com/cancer-cell/current.rss",
-                "Science": "https://www.science.org/action/showFeed?type=etoc&feed=rss&jc=science",
-                "The Lancet": "https://www.thelancet.com/rssfeed/lancet_current.xml",
-                "NEJM": "https://www.nejm.org/action/showFeed?jc=nejm&type=etoc&feed=rss",
-            }
-            for name, url in rss_sources.items():
-                try:
-                    feed = feedparser.parse(url)
-                    for entry in feed.entries[:2]:  # 每个源取 2 条
-                        articles.append({
-                            'title': f"[{name}] {entry.title}",
-                            'url': entry.link,
-                            'source': name,
-                            'published_at': entry.get('published', ''),
-                            'description': entry.get('summary', '')[:200] + '...' if entry.get('summary') else ''
-                        })
-                except Exception:
-                    continue
- 
-        if not articles:
-            articles = [{
-                'title': 'Novel Liver Cancer Immunotherapy Combination Reaches Primary Endpoint',
-                'url': '#',
-                'source': 'Medical Intelligence',
-                'published_at': datetime.now().isoformat(),
-                'description': 'PD-1 inhibitor combined with anti-angiogenic drugs significantly prolongs survival...'
-            }]
-
+        try:
+            _, articles = self.providers.resolve('news', mode=PROVIDER_MODES['news'])
+        except ProviderMiss:
+            raise RuntimeError("No news provider answered")
         return {"total_articles": len(articles), "articles": articles[:5]}
 
+    def _fetch_gnews_articles(self):
+        articles = []
+        queries = ['"liver cancer" drug', 'hepatocellular carcinoma treatment', '肝癌 药物']
+        for q in queries[:2]:
+            try:
+                data = self._http_client('gnews').single_flight(('search', q), self._fetch_gnews, q)
+                for a in data.get('articles', []):
+                    if not any(x['title'] == a['title'] for x in articles):
+                        articles.append({
+                            'title': a['title'],
+                            'url': a['url'],
+                            'source': a.get('source', {}).get('name', 'Unknown'),
+                            'published_at': a.get('publishedAt', ''),
+                            'description': (a.get('description', '')[:200] + '...') if a.get('description') else ''
+                        })
+            except Exception:
+                continue
+        return articles or None
+
+    def _fetch_gnews(self, q):
+        url = f'https://gnews.io/api/v4/search?q={q}&lang=en&max=5&apikey={self.news_api_key}'
+        r = self._http_client('gnews').get(url, timeout=10)
+        if r.status_code == 403:  # GNews answers 403 once the day's request quota is spent
+            self.resources.quota_ledger.report_throttled('gnews', daily=True)
+        r.raise_for_status()
+        return r.json()
+
+    def _fetch_rss_feed(self, url):
+        """Conditional GET of one journal feed; a 304 reuses the entries kept from the last download"""
+        cache = self.resources.feed_cache
+        cached = cache.get(url)
+        headers = {'User-Agent': feedparser.USER_AGENT}
+        if cached:
+            if cached['etag']:
+                headers['If-None-Match'] = cached['etag']
+            if cached['last_modified']:
+                headers['If-Modified-Since'] = cached['last_modified']
+        r = self._http_client(urlparse(url).hostname).get(url, headers=headers, timeout=10, stream=True)
+        if r.status_code == 304 and cached:
+            r.close()
+            return cached['entries']
+        r.raise_for_status()
+        etag, last_modified = r.headers.get('ETag'), r.headers.get('Last-Modified')
+        entries = read_feed_head(r, RSS_ENTRIES_PER_FEED)
+        cache.put(url, etag, last_modified, entries)
+        return entries
+
+    def _fetch_rss_articles(self):
+        """Fetch all journal feeds in parallel; the sweep costs roughly the slowest feed"""
+        rss_sources = {
+            "Nature": "https://www.nature.com/nature.rss",
+            "Nature Medicine": "https://www.nature.com/nm.rss",
+            "Cancer Cell": "https://www.cell.com/cancer-cell/current.rss",
+            "Science": "https://www.science.org/action/showFeed?type=etoc&feed=rss&jc=science",
+            "The Lancet": "https://www.thelancet.com/rssfeed/lancet_current.xml",
+            "NEJM": "https://www.nejm.org/action/showFeed?jc=nejm&type=etoc&feed=rss",
+        }
+        executor = ThreadPoolExecutor(max_workers=len(rss_sources), thread_name_prefix="rss-fetch")
+        futures = {name: executor.submit(self._http_client(urlparse(url).hostname).single_flight,
+                                         ('feed', url), self._fetch_rss_feed, url)
+                   for name, url in rss_sources.items()}
+        done, _ = wait(futures.values(), timeout=RSS_FETCH_DEADLINE)
+        executor.shutdown(wait=False, cancel_futures=True)
 
-    @st.cache_data(ttl=3600)
-    def get_clinical_trials(_self):
+        articles = []
+        for name, future in futures.items():  # Keep the journal order of rss_sources
+            if future not in done or future.exception() is not None:
+                continue
+            for entry in future.result()[:RSS_ENTRIES_PER_FEED]:  # 每个源取 2 条
+                articles.append({
+                    'title': f"[{name}] {entry['title']}",
+                    'url': entry['link'],
+                    'source': name,
+                    'published_at': entry.get('published', ''),
+                    'description': entry['summary'][:200] + '...' if entry.get('summary') else ''
+                })
+        return articles
+
+    def _placeholder_news(self):
+        articles = [{
+            'title': 'Novel Liver Cancer Immunotherapy Combination Reaches Primary Endpoint',
+            'url': '#',
+            'source': 'Medical Intelligence',
+            'published_at': datetime.now().isoformat(),
+            'description': 'PD-1 inhibitor combined with anti-angiogenic drugs significantly prolongs survival...'
+        }]
+        return {"total_articles": len(articles), "articles": articles}
+
+    @stale_while_revalidate('market_caps', ttl=MARKET_DATA_TTL, fallback=_fallback_market_caps,
+                            refresh_ahead=MARKET_CAP_REFRESH_AHEAD)
+    def get_market_caps(self):
+        """Market caps (billions USD), served stale-while-revalidate and refreshed before they expire"""
+        return self._fetch_market_caps()
+
+    @stale_while_revalidate('news', ttl=MARKET_DATA_TTL, fallback=_placeholder_news)
+    def get_market_news(self):
+        return self._fetch_market_news()
+
+    @stale_while_revalidate('clinical_trials', ttl=3600)
+    def get_clinical_trials(self):
+        """ClinicalTrialRepository over the current trial list, indexed once per load"""
+        return ClinicalTrialRepository(self._fetch_clinical_trials())
+
+    def _fetch_clinical_trials(self):
+        """Liver cancer studies from the local ClinicalTrials.gov store, or the built-in sample without one"""
+        stored = get_trial_store().trials()
+        if not stored:
+            return self._sample_clinical_trials()
+        for trial in stored:
+            trial['sponsor'] = self._trial_sponsor(trial['lead_sponsor'])
+        return stored
+
+    def _trial_sponsor(self, lead_sponsor):
+        """Watchlist company running the study, or the lead sponsor as registered"""
+        name = lead_sponsor.lower()
+        for company, aliases in self.trial_sponsor_aliases.items():
+            if any(alias in name for alias in aliases):
+                return company
+        return lead_sponsor
+
+    @staticmethod
+    def _sample_clinical_trials():
         return [
             {"title": "Phase III Liver Cancer Immunotherapy Combination Study", "sponsor": "Roche",
              "phase": "Phase III", "status": "Recruiting",
@@ -456,16 +1932,212 @@ class EnhancedDataManager:
             'market_caps': market_caps
         }
 
+    def get_score_matrix(self, past_points):
+        """Company × metric scores for this run's snapshot, shared by the scoring and visualization tabs"""
+        if past_points not in self._score_matrices:
+            companies = tuple(self.companies)
+            prices, _ = self.get_stock_prices()
+            price_windows = self.get_price_windows(past_points)
+            market_caps = self.get_market_caps()
+            trials = self.get_clinical_trials()
+
+            lengths = np.array([len(price_windows[c].prices) for c in companies], dtype=np.int64)
+            trend_prices = np.full((len(companies), int(lengths.max(initial=0))), np.nan)
+            for i, company in enumerate(companies):
+                trend_prices[i, :lengths[i]] = price_windows[company].prices
+
+            self._score_matrices[past_points] = compute_score_matrix(
+                companies, trend_prices, tuple(lengths.tolist()),
+                tuple(trials.count(sponsor=c) for c in companies),
+                self.get_market_news()['total_articles'],
+                tuple(market_caps.get(c, 0) for c in companies),
+                tuple(prices.get(c, 0) for c in companies)
+            )
+        return self._score_matrices[past_points]
+
     def update_carousel(self):
-        """Update carousel index, switch every 5 seconds"""
+        """Update carousel index, switch every CAROUSEL_INTERVAL seconds"""
         current_time = datetime.now()
-        if (current_time - st.session_state.last_carousel_update).total_seconds() >= 5:
-            st.session_state.carousel_index = (st.session_state.carousel_index + 1) % len(self.companies)
+        last_update = st.session_state.setdefault('last_carousel_update', current_time)
+        index = st.session_state.setdefault('carousel_index', 0)
+        if (current_time - last_update).total_seconds() >= CAROUSEL_INTERVAL:
+            st.session_state.carousel_index = (index + 1) % len(self.companies)
             st.session_state.last_carousel_update = current_time
 
     def update_animation_frame(self):
         """Update animation frame for dynamic visualizations"""
-        st.session_state.animation_frame = (st.session_state.animation_frame + 1) % 100
+        st.session_state.animation_frame = (st.session_state.get('animation_frame', 0) + 1) % 100
+
+
+# ---------------------------
+# Scoring Engine: Company × Metric Score Matrix
+# ---------------------------
+SCORE_METRICS = ['Price Stability', 'R&D Activity', 'Media Attention', 'Market Cap Size', 'Price Performance']
+
+
+@st.cache_data(max_entries=64)
+def compute_score_matrix(companies, trend_prices, trend_lengths, trial_counts, news_count, market_caps, prices):
+    """
+    Score every company on every metric in one vectorized pass.
+    trend_prices is a companies × window matrix padded with NaN past each row's trend_lengths;
+    the other per-company inputs are tuples aligned with companies. Memoized on its inputs,
+    so an unchanged data snapshot is scored once no matter how many tabs ask for it.
+    """
+    trend_lengths = np.asarray(trend_lengths)
+    trial_counts = np.asarray(trial_counts, dtype=float)
+    market_caps = np.asarray(market_caps, dtype=float)
+    prices = np.asarray(prices, dtype=float)
+
+    # Stock Price Stability Score
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)  # Rows without any tick are all-NaN
+        price_vol = np.nanstd(trend_prices, axis=1) if trend_prices.size else np.zeros(len(companies))
+    price_vol = np.where(trend_lengths > 1, price_vol, 0.0)
+    price_score = np.maximum(0, 100 - price_vol * 15)
+
+    # R&D Activity Score - 25 points per company-specific clinical trial, 20 base points
+    rnd_score = np.minimum(100, trial_counts * 25 + 20)
+
+    # Media Attention Score - Simplified processing
+    media_score = np.full(len(companies), min(100, news_count * 8 + 20), dtype=float)
+
+    # Market Cap Size Score - 10 points per $20B, max 100
+    market_cap_score = np.minimum(100, market_caps * 0.5)
+
+    # Price Performance Score (relative to average price, normalized processing)
+    avg_price = prices.mean() if len(prices) else 0
+    if avg_price > 0:
+        price_perf_score = np.clip((prices / avg_price - 0.8) * 500, 0, 100)
+    else:
+        price_perf_score = np.full(len(companies), 50.0)
+
+    df = pd.DataFrame(
+        np.column_stack([price_score, rnd_score, media_score, market_cap_score, price_perf_score]),
+        index=pd.Index(companies, name="Company"),
+        columns=SCORE_METRICS
+    )
+    return df
+
+
+# ---------------------------
+# FigureCache: Serialized Figures Keyed on Input Fingerprints
+# ---------------------------
+class FigureCache:
+    """Process-wide LRU of Plotly figure JSON, keyed on (builder, fingerprint of its inputs)"""
+
+    def __init__(self, max_entries=FIGURE_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._figures = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            fig_json = self._figures.get(key)
+            if fig_json is None:
+                self.misses += 1
+                return None
+            self._figures.move_to_end(key)
+            self.hits += 1
+            return fig_json
+
+    def put(self, key, fig_json):
+        with self._lock:
+            self._figures[key] = fig_json
+            self._figures.move_to_end(key)
+            while len(self._figures) > self.max_entries:
+                self._figures.popitem(last=False)
+
+
+@st.cache_resource
+def get_figure_cache():
+    return FigureCache()
+
+
+def fingerprint(*values):
+    """Content hash of chart inputs: DataFrames by their index, columns and cell values, dicts by items"""
+    digest = hashlib.blake2b(digest_size=16)
+    for value in values:
+        if isinstance(value, pd.DataFrame):
+            digest.update(repr((value.index.tolist(), value.columns.tolist())).encode())
+            digest.update(pd.util.hash_pandas_object(value, index=False).values.tobytes())
+        elif isinstance(value, dict):
+            digest.update(repr(sorted(value.items())).encode())
+        else:
+            digest.update(repr(value).encode())
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+def cached_figure(builder):
+    """
+    Decorator for create_* chart builders: a call whose inputs match an earlier one rebuilds the
+    figure from its cached JSON instead of re-running the builder.
+    """
+    @functools.wraps(builder)
+    def wrapper(*args):
+        cache = get_figure_cache()
+        key = (builder.__name__, fingerprint(*args))
+        fig_json = cache.get(key)
+        if fig_json is None:
+            fig = builder(*args)
+            cache.put(key, fig.to_json())
+            return fig
+        return pio.from_json(fig_json)
+    return wrapper
+
+
+# ---------------------------
+# Downsampling: MinMax preselection + Largest-Triangle-Three-Buckets
+# ---------------------------
+def minmax_indices(y, n_buckets):
+    """Indices of the min and max of y in each of n_buckets equal-size buckets (plus both ends), sorted"""
+    n = len(y)
+    size = math.ceil(n / n_buckets)
+    padded = np.pad(np.asarray(y, dtype=float), (0, n_buckets * size - n), mode='edge').reshape(n_buckets, size)
+    offsets = np.arange(n_buckets) * size
+    picks = np.concatenate(([0, n - 1], offsets + padded.argmin(axis=1), offsets + padded.argmax(axis=1)))
+    return np.unique(np.minimum(picks, n - 1))
+
+
+def lttb_indices(x, y, n_out):
+    """Largest-Triangle-Three-Buckets: indices of n_out points that best preserve the visual shape"""
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    # First and last points are kept; the n-2 points between them are split into n_out-2 buckets
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    out = np.empty(n_out, dtype=np.int64)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+        # Point of this bucket forming the largest triangle with the last pick and the next bucket's mean
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(area.argmax())
+        out[i + 1] = a
+    return out
+
+
+def downsample_indices(timestamps, prices, max_points=CHART_MAX_POINTS):
+    """
+    Indices of at most max_points samples of a price series. Very long series are first reduced
+    to per-bucket minima/maxima (cheap, vectorized, keeps spikes), then LTTB picks the final points.
+    """
+    n = len(prices)
+    if n <= max_points:
+        return np.arange(n)
+    candidates = np.arange(n)
+    if n > 4 * max_points:
+        candidates = minmax_indices(prices, 2 * max_points)
+    picked = lttb_indices(timestamps[candidates], prices[candidates], max_points)
+    return candidates[picked]
 
 
 # ---------------------------
@@ -485,22 +2157,34 @@ def hex_to_rgba(hex_color: str, alpha: float = 0.25):
     return f"rgba({r},{g},{b},{alpha})"
 
 
-def create_animated_stock_chart(stock_trends, past_points):
+def use_webgl(renderer, past_points):
+    """Whether the stock chart renderer ('Auto', 'SVG' or 'WebGL') resolves to WebGL for this window"""
+    return renderer == 'WebGL' or (renderer == 'Auto' and past_points > WEBGL_POINT_THRESHOLD)
+
+
+def create_animated_stock_chart(price_windows, past_points, renderer='Auto'):
     """Create animated stock price chart with enhanced visual effects"""
     fig = go.Figure()
     colors = ['#667eea', '#764ba2', '#f093fb', '#f5576c', '#4facfe', '#00f2fe', '#a8e6cf']
+    # WebGL (Scattergl) keeps long windows smooth; SVG is kept for short ones
+    scatter = go.Scattergl if use_webgl(renderer, past_points) else go.Scatter
 
     # Add traces for each company
-    for i, (company, trend) in enumerate(stock_trends.items()):
-        if trend:
-            recent = trend[-past_points:]
-            if recent:  # Ensure there is data
+    for i, (company, window) in enumerate(price_windows.items()):
+        if len(window.prices):
+            timestamps = window.timestamps[-past_points:]
+            prices = window.prices[-past_points:]
+            # Reduce long windows to a pixel-appropriate number of points before serialization
+            keep = downsample_indices(timestamps, prices)
+            x = to_local_datetimes(timestamps[keep])
+            y = prices[keep]
+            if len(y):  # Ensure there is data
                 # Create main trace
-                fig.add_trace(go.Scatter(
-                    x=[p['timestamp'] for p in recent],
-                    y=[p['price'] for p in recent],
+                fig.add_trace(scatter(
+                    x=x,
+                    y=y,
                     name=company,
-                    mode='lines+markers',
+                    mode='lines+markers' if past_points <= CHART_MARKER_POINT_LIMIT else 'lines',
                     line=dict(width=4, color=colors[i % len(colors)]),
                     marker=dict(size=8, color=colors[i % len(colors)],
                                 line=dict(width=2, color='white')),
@@ -508,9 +2192,9 @@ def create_animated_stock_chart(stock_trends, past_points):
                 ))
 
                 # Add a subtle glow effect
-                fig.add_trace(go.Scatter(
-                    x=[p['timestamp'] for p in recent],
-                    y=[p['price'] for p in recent],
+                fig.add_trace(scatter(
+                    x=x,
+                    y=y,
                     mode='lines',
                     line=dict(width=8, color=colors[i % len(colors)]),
                     opacity=0.2,
@@ -694,6 +2378,7 @@ def create_market_cap_bubble_chart(prices, market_caps):
     return fig
 
 
+@cached_figure
 def create_3d_surface_plot(metrics_df):
     """Create 3D surface plot for metrics visualization"""
     companies = metrics_df.index.tolist()
@@ -738,6 +2423,7 @@ def create_3d_surface_plot(metrics_df):
     return fig
 
 
+@cached_figure
 def create_sunburst_chart(metrics_df, market_caps):
     """Create sunburst chart for hierarchical data visualization"""
     # Prepare data for sunburst
@@ -787,6 +2473,7 @@ def create_sunburst_chart(metrics_df, market_caps):
     return fig
 
 
+@cached_figure
 def create_scatter_matrix(metrics_df):
     """Create scatter plot matrix as alternative to parallel coordinates"""
     # Reset index to include company names as a column
@@ -813,6 +2500,7 @@ def create_scatter_matrix(metrics_df):
     return fig
 
 
+@cached_figure
 def create_treemap_chart(metrics_df, market_caps):
     """Create treemap chart for hierarchical data visualization"""
     # Prepare data for treemap
@@ -854,6 +2542,7 @@ def create_treemap_chart(metrics_df, market_caps):
     return fig
 
 
+@cached_figure
 def create_animated_bar_chart(metrics_df):
     """Create animated bar chart for metric comparison"""
     # Reset index and melt the dataframe
@@ -885,6 +2574,7 @@ def create_animated_bar_chart(metrics_df):
     return fig
 
 
+@cached_figure
 def create_polar_bar_chart(metrics_df):
     """Create polar bar chart for circular data visualization"""
     companies = metrics_df.index.tolist()
@@ -920,6 +2610,7 @@ def create_polar_bar_chart(metrics_df):
     return fig
 
 
+@cached_figure
 def create_streamgraph(metrics_df):
     """Create streamgraph for temporal data visualization"""
     # Simulate temporal data for streamgraph
@@ -960,6 +2651,7 @@ def create_streamgraph(metrics_df):
     return fig
 
 
+@cached_figure
 def create_correlation_heatmap(metrics_df):
     """Create correlation heatmap for metrics"""
     corr_matrix = metrics_df.corr()
@@ -982,6 +2674,7 @@ def create_correlation_heatmap(metrics_df):
     return fig
 
 
+@cached_figure
 def create_radial_progress_chart(metrics_df):
     """Create radial progress chart for overall scores"""
     companies = metrics_df.index.tolist()
@@ -1019,9 +2712,123 @@ def create_radial_progress_chart(metrics_df):
     return fig
 
 
+# ---------------------------
+# LiveChartFeed: Streaming Stock Chart Messages
+# ---------------------------
+live_stock_chart = components.declare_component('live_stock_chart', path=LIVE_CHART_COMPONENT_DIR)
+
+
+@st.cache_resource
+def get_live_chart_plotly_js():
+    """
+    Script path the component loads plotly.js from: the copy bundled with plotly.py, served from the
+    component directory so the chart works offline. Only a read-only install falls back to the CDN.
+    """
+    path = os.path.join(LIVE_CHART_COMPONENT_DIR, PLOTLY_JS_FILE)
+    if not os.path.exists(path):
+        try:
+            fd, tmp = tempfile.mkstemp(dir=LIVE_CHART_COMPONENT_DIR, suffix='.tmp')
+        except OSError:
+            return f"https://cdn.plot.ly/{PLOTLY_JS_FILE}"
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(get_plotlyjs())
+            os.chmod(tmp, 0o644)
+            os.replace(tmp, path)
+        except OSError:
+            os.unlink(tmp)
+            return f"https://cdn.plot.ly/{PLOTLY_JS_FILE}"
+    return PLOTLY_JS_FILE
+
+
+def plain_arrays(value):
+    """
+    Replace plotly's base64 typed arrays ({'dtype', 'bdata'[, 'shape']}) in a figure dict with plain
+    lists: Plotly.react keeps the typed-array object in gd.data, and Plotly.extendTraces cannot append to it.
+    """
+    if isinstance(value, dict):
+        if 'dtype' in value and 'bdata' in value:
+            array = np.frombuffer(base64.b64decode(value['bdata']), dtype=value['dtype'])
+            if 'shape' in value:
+                array = array.reshape([int(n) for n in str(value['shape']).split(',')])
+            if array.dtype.kind == 'f' and np.isnan(array).any():
+                array = np.where(np.isnan(array), None, array)  # JSON has no NaN
+            return array.tolist()
+        return {key: plain_arrays(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [plain_arrays(item) for item in value]
+    return value
+
+
+class LiveChartFeed:
+    """
+    Per-session sender state of the streaming stock chart. It remembers the newest tick the browser
+    holds per company, so a tick ships only points added since; the full figure is sent only on
+    the first render, when the window or company set changes, or when the browser asks for a resync.
+    """
+
+    def __init__(self):
+        self.stream = os.urandom(4).hex()  # Lets the browser tell a fresh feed from a stale one
+        self.seq = 0
+        self.companies = None
+        self.past_points = None
+        self.renderer = None
+        self.last_ts = {}
+        self.resync_requested = False
+
+    def request_resync(self):
+        self.resync_requested = True
+
+    def next_message(self, price_windows, past_points, renderer='Auto'):
+        companies = [company for company, window in price_windows.items() if len(window.prices)]
+        base_seq = self.seq
+        # A downsampled window is re-picked as a whole each tick (its size is bounded by CHART_MAX_POINTS)
+        downsampled = any(len(price_windows[company].prices) > CHART_MAX_POINTS for company in companies)
+        if (self.resync_requested or downsampled or companies != self.companies
+                or (past_points, renderer) != (self.past_points, self.renderer)):
+            self.seq += 1
+            figure = create_animated_stock_chart(price_windows, past_points, renderer)
+            message = {'kind': 'reset', 'figure': plain_arrays(json.loads(figure.to_json()))}
+        else:
+            # Trace 2k is company k's line and 2k+1 its glow; both get the same new points
+            indices, xs, ys = [], [], []
+            for k, company in enumerate(companies):
+                window = price_windows[company]
+                start = int(np.searchsorted(window.timestamps, self.last_ts[company], side='right'))
+                if start < len(window.prices):
+                    x = np.datetime_as_string(to_local_datetimes(window.timestamps[start:]), unit='ms').tolist()
+                    y = window.prices[start:].tolist()
+                    indices += [2 * k, 2 * k + 1]
+                    xs += [x, x]
+                    ys += [y, y]
+            if indices:
+                self.seq += 1
+            message = {'kind': 'extend', 'base_seq': base_seq, 'indices': indices, 'x': xs, 'y': ys}
+
+        self.resync_requested = False
+        self.companies = companies
+        self.past_points = past_points
+        self.renderer = renderer
+        self.last_ts = {company: int(price_windows[company].timestamps[-1]) for company in companies}
+        message.update(stream=self.stream, seq=self.seq)
+        return message
+
+
 # ---------------------------
 # UI Rendering Functions
 # ---------------------------
+def render_staleness_notice(key, label):
+    """Caption flagging data served from an expired entry or after a failed refresh"""
+    status = get_shared_data_store().status(key)
+    if not status['stale']:
+        return
+    if status['published_at']:
+        since = datetime.fromtimestamp(status['published_at']).strftime("%Y-%m-%d %H:%M:%S")
+        st.caption(f"⚠️ {label} may be outdated: showing data from {since} until a refresh succeeds")
+    else:
+        st.caption(f"⚠️ {label} unavailable from live providers: showing fallback values")
+
+
 def render_header():
     col1, col2, col3 = st.columns([1, 3, 1])
     with col2:
@@ -1071,14 +2878,28 @@ def render_sidebar(data_manager):
 
         auto_refresh = st.checkbox("📡 Auto Refresh", value=True)
 
-        past_points = st.slider("📉 Show Last N Data Points", min_value=1, max_value=100, value=30)
+        st.checkbox("⚡ Lazy Tabs", value=True, key='lazy_tabs',
+                    help="Render only the selected view instead of computing every tab on each run")
+
+        st.checkbox("📡 Streaming Chart", value=True, key='streaming_chart',
+                    help="Send only new points to the live stock chart instead of the whole figure on every refresh")
+
+        # Background poller refreshes shared data on this schedule; unchecking Auto Refresh pauses it
+        get_background_poller().configure(refresh_rate, auto_refresh)
+        # Live fragments (price cards, trend chart, radar carousel) re-run on their own at this interval
+        refresh_interval = refresh_rate if auto_refresh else None
+        st.session_state.refresh_interval = refresh_interval
+
+        past_points = st.slider("📉 Show Last N Data Points", min_value=1, max_value=PRICE_RING_CAPACITY, value=30)
+
+        st.selectbox("🖥️ Chart Renderer", ["Auto", "SVG", "WebGL"], key='chart_renderer',
+                     help=f"Auto uses WebGL above {WEBGL_POINT_THRESHOLD} points; long windows are downsampled "
+                          f"to {CHART_MAX_POINTS} points per company")
 
         if st.button("🎯 Manual Data Refresh", use_container_width=True):
             st.cache_data.clear()
-            if 'stock_trends' in st.session_state:
-                for company in st.session_state.stock_trends:
-                    st.session_state.stock_trends[company] = st.session_state.stock_trends[company][
-                                                             -10:]  # Keep some data
+            for key in ('quotes', 'market_caps', 'news', 'clinical_trials'):
+                get_shared_data_store().invalidate(key)
             st.rerun()
 
         st.divider()
@@ -1095,91 +2916,34 @@ def render_sidebar(data_manager):
         </div>
         """, unsafe_allow_html=True)
 
-        prices, sources = data_manager.get_stock_prices()
-        market_caps = data_manager.get_market_caps()
-
-        for company, price in prices.items():
-            trend = st.session_state.stock_trends.get(company, [])
-            recent = trend[-past_points:] if trend else []
-            if len(recent) >= 2:
-                prev = recent[-2]['price']  # Use second to last point as previous price
-                current = recent[-1]['price']
-                change = current - prev
-                change_pct = (change / prev * 100.0) if prev != 0 else 0.0
-            else:
-                change = 0.0
-                change_pct = 0.0
-
-            if change > 0:
-                color = "#10b981"
-                icon = "📈"
-            elif change < 0:
-                color = "#ef4444"
-                icon = "📉"
-            else:
-                color = "rgba(255,255,255,0.6)"
-                icon = "—"
-
-            mc = market_caps.get(company, 0.0)
-
-            st.markdown(f"""
-            <div style='
-                background: rgba(30,41,59,0.8);
-                padding: 1rem;
-                border-radius: 12px;
-                margin: 0.5rem 0;
-                border-left: 4px solid {color};
-            '>
-                <div style='display: flex; justify-content: space-between; align-items: center;'>
-                    <div>
-                        <strong style='color:white;'>{company}</strong><br>
-                        <small style='color:rgba(255,255,255,0.6);'>Source: {sources.get(company, 'Simulated Data')}</small><br>
-                        <small style='color:rgba(255,255,255,0.6);'>Market Cap: ${mc:.1f}B</small>
-                    </div>
-                    <div style='text-align: right;'>
-                        <div style='font-size: 1.2rem; font-weight: bold; color:white;'>${price:.2f}</div>
-                        <div style='color:{color}; font-weight: bold;'>
-                            {icon} {change:+.2f} ({change_pct:+.1f}%)
-                        </div>
-                    </div>
-                </div>
-            </div>
-            """, unsafe_allow_html=True)
+        # Each refresh tick re-runs and re-sends only the cards, not the whole page
+        st.fragment(render_price_cards, run_every=refresh_interval)(past_points)
 
-        # Export CSV (Enhanced: includes change, percent_change, market_cap)
+        # Export (Enhanced: includes change, percent_change, market_cap), streamed from the price store
         st.divider()
         st.markdown("### 💾 Export Data")
-        if st.button("Export Last N Points as CSV", use_container_width=True):
-            rows = []
-            for company, trend in st.session_state.stock_trends.items():
-                recent = trend[-past_points:] if trend else []
-                mc_val = market_caps.get(company, data_manager.fallback_market_caps.get(company, 0.0))
-                for i, point in enumerate(recent):
-                    if i > 0:
-                        prev_p = recent[i - 1]['price']
-                        change = point['price'] - prev_p
-                        pct = (change / prev_p * 100.0) if prev_p != 0 else 0.0
-                    else:
-                        change = 0.0
-                        pct = 0.0
-                    rows.append({
-                        'company': company,
-                        'timestamp': point['timestamp'].isoformat(),
-                        'price': point['price'],
-                        'change': change,
-                        'percent_change': pct,
-                        'market_cap_billion_usd': mc_val,
-                        'data_source': point.get('source', 'Unknown')
-                    })
-            if rows:
-                df_out = pd.DataFrame(rows)
-                csv_bytes = df_out.to_csv(index=False).encode('utf-8')
-                st.download_button("📥 Click to Download CSV", data=csv_bytes,
-                                   file_name=f"liver_cancer_companies_data_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                                   mime="text/csv",
-                                   use_container_width=True)
-            else:
-                st.info("No historical data available for export (try again after data collection)")
+        export_range = st.radio("Range", ["Last N Points", "Full History"], horizontal=True, key='export_range')
+        export_format = st.selectbox("Format", available_export_formats(), key='export_format')
+        if pq is None:
+            st.caption("Install pyarrow to enable Parquet export")
+        if st.button(f"Export {export_range} as {export_format}", use_container_width=True):
+            market_caps = dict(data_manager.fallback_market_caps, **data_manager.get_market_caps())
+            with st.spinner("Exporting price history..."):
+                path, row_count = export_price_history(
+                    data_manager.companies, market_caps, export_format,
+                    limit=past_points if export_range == "Last N Points" else None)
+            try:
+                if row_count:
+                    extension, mime = EXPORT_FORMATS[export_format]
+                    with open(path, 'rb') as f:
+                        st.download_button(f"📥 Click to Download {export_format} ({row_count:,} rows)", data=f,
+                                           file_name=f"liver_cancer_companies_data_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{extension}",
+                                           mime=mime,
+                                           use_container_width=True)
+                else:
+                    st.info("No historical data available for export (try again after data collection)")
+            finally:
+                os.remove(path)
 
         st.session_state.past_points = past_points
 
@@ -1193,6 +2957,79 @@ def render_sidebar(data_manager):
             f"- FinancialModelingPrep (FMP): {'✅ Configured' if data_manager.fmp_api_key else '❌ Not Configured'}")
         st.markdown(f"- Yahoo Finance: ✅ Available (Fallback)")
         st.markdown(f"- Market Cap Priority: FMP → Yahoo → Fallback Values")
+        configured = {'alpha_vantage': data_manager.alpha_vantage_key, 'fmp': data_manager.fmp_api_key,
+                      'gnews': data_manager.news_api_key}
+        for provider, key in configured.items():
+            if key:
+                left, wait_s = get_quota_ledger().remaining(provider)
+                note = f", next in {wait_s:.0f}s" if left and wait_s else ""
+                st.markdown(f"- {provider} budget: {left}/{PROVIDER_RATE_LIMITS[provider][2]} requests left today{note}")
+        metrics = get_provider_metrics().snapshot()
+        if metrics:
+            with st.expander("Provider Metrics"):
+                st.dataframe(pd.DataFrame(metrics).round({'success_rate': 2, 'p50_ms': 0, 'p95_ms': 0}),
+                             hide_index=True, use_container_width=True)
+        for provider, (state, retry_in) in get_provider_clients().statuses().items():
+            if state == 'open':
+                st.markdown(f"- ⛔ {provider}: failing, skipped for {retry_in:.0f}s")
+            elif state == 'half-open':
+                st.markdown(f"- ⚠️ {provider}: failing, next request probes it")
+
+
+def render_price_cards(past_points):
+    """Sidebar price & market-cap cards, run as a fragment on the refresh schedule"""
+    data_manager = EnhancedDataManager()  # Each fragment run takes its own run-scoped quote snapshot
+    prices, sources = data_manager.get_stock_prices()
+    market_caps = data_manager.get_market_caps()
+    price_windows = data_manager.get_price_windows(past_points)
+
+    for company, price in prices.items():
+        window = price_windows.get(company)
+        recent = window.prices if window is not None else ()
+        if len(recent) >= 2:
+            prev = float(recent[-2])  # Use second to last point as previous price
+            current = float(recent[-1])
+            change = current - prev
+            change_pct = (change / prev * 100.0) if prev != 0 else 0.0
+        else:
+            change = 0.0
+            change_pct = 0.0
+
+        if change > 0:
+            color = "#10b981"
+            icon = "📈"
+        elif change < 0:
+            color = "#ef4444"
+            icon = "📉"
+        else:
+            color = "rgba(255,255,255,0.6)"
+            icon = "—"
+
+        mc = market_caps.get(company, 0.0)
+
+        st.markdown(f"""
+        <div style='
+            background: rgba(30,41,59,0.8);
+            padding: 1rem;
+            border-radius: 12px;
+            margin: 0.5rem 0;
+            border-left: 4px solid {color};
+        '>
+            <div style='display: flex; justify-content: space-between; align-items: center;'>
+                <div>
+                    <strong style='color:white;'>{company}</strong><br>
+                    <small style='color:rgba(255,255,255,0.6);'>Source: {sources.get(company, 'Simulated Data')}</small><br>
+                    <small style='color:rgba(255,255,255,0.6);'>Market Cap: ${mc:.1f}B</small>
+                </div>
+                <div style='text-align: right;'>
+                    <div style='font-size: 1.2rem; font-weight: bold; color:white;'>${price:.2f}</div>
+                    <div style='color:{color}; font-weight: bold;'>
+                        {icon} {change:+.2f} ({change_pct:+.1f}%)
+                    </div>
+                </div>
+            </div>
+        </div>
+        """, unsafe_allow_html=True)
 
 
 def render_market_overview(data_manager):
@@ -1241,6 +3078,7 @@ def render_market_overview(data_manager):
 
     # Second Row - Market Cap Overview
     st.markdown("### 🏦 Company Market Cap Overview (Billions USD)")
+    render_staleness_notice('market_caps', "Market caps")
     market_caps = metrics['market_caps']
     cap_cols = st.columns(len(market_caps))
 
@@ -1260,13 +3098,9 @@ def render_market_overview(data_manager):
             </div>
             """, unsafe_allow_html=True)
 
-    # Animated Stock Price Chart
+    # Animated Stock Price Chart, refreshed on its own on the refresh schedule
     past_points = st.session_state.get('past_points', 30)
-    st.markdown(f"### 📈 Real-time Pharma Stock Trends (Last {past_points} Points)")
-
-    # Create animated stock chart
-    fig_stock = create_animated_stock_chart(st.session_state.stock_trends, past_points)
-    st.plotly_chart(fig_stock, use_container_width=True)
+    st.fragment(render_stock_trend_chart, run_every=st.session_state.get('refresh_interval'))(past_points)
 
     # Market Cap Bubble Chart
     st.markdown("### 💹 Market Cap vs Stock Price Visualization")
@@ -1274,6 +3108,27 @@ def render_market_overview(data_manager):
     market_caps = data_manager.get_market_caps()
     fig_bubble = create_market_cap_bubble_chart(prices, market_caps)
     st.plotly_chart(fig_bubble, use_container_width=True)
+
+
+def render_stock_trend_chart(past_points):
+    """Real-time stock trend chart, run as a fragment on the refresh schedule"""
+    data_manager = EnhancedDataManager()
+    st.markdown(f"### 📈 Real-time Pharma Stock Trends (Last {past_points} Points)")
+
+    price_windows = data_manager.get_price_windows(past_points)
+    renderer = st.session_state.get('chart_renderer', 'Auto')
+    if st.session_state.get('streaming_chart', True):
+        # Browser keeps the figure and appends each tick's new points; trimmed to past_points client-side
+        feed = st.session_state.setdefault('live_chart_feed', LiveChartFeed())
+        message = feed.next_message(price_windows, past_points, renderer)
+        live_stock_chart(message=message, max_points=past_points, height=LIVE_CHART_HEIGHT, plotly_js=get_live_chart_plotly_js(),
+                         key='live_stock_chart', default=None, on_change=feed.request_resync)
+    else:
+        # Create animated stock chart
+        fig_stock = create_animated_stock_chart(price_windows, past_points, renderer)
+        st.plotly_chart(fig_stock, use_container_width=True)
+
+
 def render_advanced_visualizations(data_manager):
     st.markdown('<div class="section-header">🎨 Advanced Data Visualizations</div>', unsafe_allow_html=True)
 
@@ -1281,51 +3136,9 @@ def render_advanced_visualizations(data_manager):
     data_manager.update_animation_frame()
 
     # Calculate metrics for visualizations
-    prices, sources = data_manager.get_stock_prices()
-    trials_count = len(data_manager.get_clinical_trials())
-    news_count = data_manager.get_market_news()['total_articles']
     market_caps = data_manager.get_market_caps()
     past_points = st.session_state.get('past_points', 30)
-
-    # Calculate scoring metrics for each company
-    metrics = {}
-    for company in data_manager.companies:
-        recent = st.session_state.stock_trends.get(company, [])[-past_points:]
-        trend_prices = [p['price'] for p in recent] if recent else []
-
-        # Stock Price Stability Score
-        price_vol = np.std(trend_prices) if trend_prices and len(trend_prices) > 1 else 0
-        price_score = max(0, 100 - price_vol * 15)
-
-        # R&D Activity Score - Based on company-specific clinical trials
-        company_trials = [t for t in data_manager.get_clinical_trials() if t['sponsor'] == company]
-        rnd_score = min(100, len(company_trials) * 25 + 20)  # 25 points per trial, 20 base points
-
-        # Media Attention Score - Simplified processing
-        media_score = min(100, news_count * 8 + 20)
-
-        # Market Cap Size Score
-        market_cap = market_caps.get(company, 0)
-        market_cap_score = min(100, market_cap * 0.5)  # 10 points per $20B, max 100
-
-        # Price Performance Score (relative to average price)
-        current_price = prices.get(company, 0)
-        avg_price = np.mean([prices.get(c, 0) for c in data_manager.companies]) if prices else current_price
-        if avg_price > 0:
-            price_perf_score = min(100, max(0, (current_price / avg_price - 0.8) * 500))  # Normalized processing
-        else:
-            price_perf_score = 50
-
-        metrics[company] = {
-            'Price Stability': price_score,
-            'R&D Activity': rnd_score,
-            'Media Attention': media_score,
-            'Market Cap Size': market_cap_score,
-            'Price Performance': price_perf_score
-        }
-
-    df = pd.DataFrame(metrics).T
-    df.index.name = "Company"
+    df = data_manager.get_score_matrix(past_points)
 
     # 3D Surface Plot
     st.markdown("### 🌐 3D Surface Visualization")
@@ -1393,76 +3206,23 @@ def render_dynamic_score_panel(data_manager):
     st.markdown('<div class="section-header">🌟 Dynamic Comprehensive Scoring Panel (Auto-rotation)</div>',
                 unsafe_allow_html=True)
 
-    # Update carousel
-    data_manager.update_carousel()
     data_manager.update_animation_frame()
 
-    prices, sources = data_manager.get_stock_prices()
-    trials_count = len(data_manager.get_clinical_trials())
-    news_count = data_manager.get_market_news()['total_articles']
-    market_caps = data_manager.get_market_caps()
     past_points = st.session_state.get('past_points', 30)
-
-    # Calculate scoring metrics for each company
-    metrics = {}
-    for company in data_manager.companies:
-        recent = st.session_state.stock_trends.get(company, [])[-past_points:]
-        trend_prices = [p['price'] for p in recent] if recent else []
-
-        # Stock Price Stability Score
-        price_vol = np.std(trend_prices) if trend_prices and len(trend_prices) > 1 else 0
-        price_score = max(0, 100 - price_vol * 15)
-
-        # R&D Activity Score - Based on company-specific clinical trials
-        company_trials = [t for t in data_manager.get_clinical_trials() if t['sponsor'] == company]
-        rnd_score = min(100, len(company_trials) * 25 + 20)  # 25 points per trial, 20 base points
-
-        # Media Attention Score - Simplified processing
-        media_score = min(100, news_count * 8 + 20)
-
-        # Market Cap Size Score
-        market_cap = market_caps.get(company, 0)
-        market_cap_score = min(100, market_cap * 0.5)  # 10 points per $20B, max 100
-
-        # Price Performance Score (relative to average price)
-        current_price = prices.get(company, 0)
-        avg_price = np.mean([prices.get(c, 0) for c in data_manager.companies]) if prices else current_price
-        if avg_price > 0:
-            price_perf_score = min(100, max(0, (current_price / avg_price - 0.8) * 500))  # Normalized processing
-        else:
-            price_perf_score = 50
-
-        metrics[company] = {
-            'Price Stability': price_score,
-            'R&D Activity': rnd_score,
-            'Media Attention': media_score,
-            'Market Cap Size': market_cap_score,
-            'Price Performance': price_perf_score
-        }
-
-    df = pd.DataFrame(metrics).T
-    df.index.name = "Company"
-    categories = list(df.columns)
-    companies = list(df.index)
-    colors = ['#667eea', '#764ba2', '#f093fb', '#f5576c', '#4facfe', '#00f2fe', '#a8e6cf']
-
-    # Get current carousel index
-    idx = st.session_state.carousel_index
-    current_company = companies[idx] if companies else ""
+    df = data_manager.get_score_matrix(past_points)
 
     # Radar Chart and Ranking Side by Side
     col1, col2 = st.columns([2, 1])
 
     with col1:
-        # Animated Radar Chart
-        fig_radar = create_animated_radar_chart(df, current_company, companies, colors)
-        st.plotly_chart(fig_radar, use_container_width=True)
+        # Animated Radar Chart: the carousel rotates in its own fragment while Auto Refresh is on
+        carousel_interval = CAROUSEL_INTERVAL if st.session_state.get('refresh_interval') else None
+        st.fragment(render_radar_carousel, run_every=carousel_interval)(past_points)
 
     with col2:
         # Comprehensive Score Ranking
         st.markdown("### 🏆 Comprehensive Score Ranking")
-        totals = {c: np.mean(list(v.values())) for c, v in metrics.items()}
-        sorted_totals = sorted(totals.items(), key=lambda x: x[1], reverse=True)
+        sorted_totals = list(df.mean(axis=1).sort_values(ascending=False, kind='stable').items())
 
         for i, (company, score) in enumerate(sorted_totals):
             color = "#10b981" if score >= 70 else "#f59e0b" if score >= 40 else "#ef4444"
@@ -1491,11 +3251,29 @@ def render_dynamic_score_panel(data_manager):
     st.plotly_chart(fig_heat, use_container_width=True)
 
 
+def render_radar_carousel(past_points):
+    """Radar chart highlighting the carousel's current company, run as a fragment every CAROUSEL_INTERVAL"""
+    data_manager = EnhancedDataManager()
+    data_manager.update_carousel()
+
+    df = data_manager.get_score_matrix(past_points)
+    companies = list(df.index)
+    colors = ['#667eea', '#764ba2', '#f093fb', '#f5576c', '#4facfe', '#00f2fe', '#a8e6cf']
+
+    # Get current carousel index
+    idx = st.session_state.carousel_index
+    current_company = companies[idx] if companies else ""
+
+    fig_radar = create_animated_radar_chart(df, current_company, companies, colors)
+    st.plotly_chart(fig_radar, use_container_width=True)
+
+
 def render_news_analysis(data_manager):
     st.markdown('<div class="section-header">📰 Industry News & Updates</div>', unsafe_allow_html=True)
 
     with st.spinner('🔄 Fetching latest news...'):
         news_data = data_manager.get_market_news()
+    render_staleness_notice('news', "Industry news")
 
     if not news_data['articles']:
         st.info("📭 No industry news available")
@@ -1544,70 +3322,100 @@ def render_clinical_trials(data_manager):
 
     with st.spinner('🔄 Fetching clinical trial data...'):
         trials = data_manager.get_clinical_trials()
+    render_staleness_notice('clinical_trials', "Clinical trial data")
 
     if not trials:
         st.info("No clinical trial data available")
         return
 
-    for trial in trials:
-        status_color = "#10b981" if trial['status'] == "Recruiting" else "#f59e0b"
-
-        interventions_html = "".join([
-            f'<span style="background: rgba(102,126,234,0.3); padding: 4px 12px; border-radius: 20px; font-size: 0.8rem; color:white; margin-right: 0.5rem; margin-bottom: 0.5rem; display: inline-block;">{intervention}</span>'
-            for intervention in trial['interventions']
-        ])
-
-        card_html = textwrap.dedent(f"""
-        <div style="background: #1e293b; padding: 1.5rem; border-radius: 1rem; margin-bottom: 1.5rem; box-shadow: 0 4px 12px rgba(0,0,0,0.2);">
-            <div style="display: flex; justify-content: space-between; align-items: start; margin-bottom: 1rem;">
-                <h4 style="margin:0; color:white; flex:1;">{trial['title']}</h4>
-                <div style="text-align: right;">
-                    <span style="background: {status_color}20; color:{status_color}; padding: 4px 12px; border-radius: 20px; font-size: 0.8rem; border: 1px solid {status_color}40;">
-                        {trial['status']}
-                    </span>
-                </div>
-            </div>
+    # Server-side filtering: every combination is one index lookup in the ClinicalTrialRepository
+    filter_cols = st.columns(3)
+    sponsor = filter_cols[0].selectbox("Sponsor", ["All"] + trials.values('sponsor'), key='trials_sponsor')
+    phase = filter_cols[1].selectbox("Phase", ["All"] + trials.values('phase'), key='trials_phase')
+    status = filter_cols[2].selectbox("Status", ["All"] + trials.values('status'), key='trials_status')
+    matches = trials.filter(*(None if value == "All" else value for value in (sponsor, phase, status)))
 
-            <div style="display: grid; grid-template-columns: 1fr 1fr 1fr; gap: 1rem; margin-bottom: 1rem;">
-                <div style="text-align: center;">
-                    <div style="font-size: 0.9rem; color:rgba(255,255,255,0.7);">Sponsor</div>
-                    <div style="font-weight: bold; color:white;">{trial['sponsor']}</div>
-                </div>
-                <div style="text-align: center;">
-                    <div style="font-size: 0.9rem; color:rgba(255,255,255,0.7);">Study Phase</div>
-                    <div style="font-weight: bold; color:white;">{trial['phase']}</div>
-                </div>
-                <div style="text-align: center;">
-                    <div style="font-size: 0.9rem; color:rgba(255,255,255,0.7);">Expected Completion</div>
-                    <div style="font-weight: bold; color:white;">{trial.get('completion', 'N/A')}</div>
-                </div>
+    if not matches:
+        st.info("No clinical trials match the selected filters")
+        return
+
+    # Back to the first page whenever the filters change
+    filters = (sponsor, phase, status)
+    if st.session_state.get('trials_filters') != filters:
+        st.session_state.trials_filters = filters
+        st.session_state.trials_page = 1
+    page_count = math.ceil(len(matches) / TRIALS_PAGE_SIZE)
+    st.session_state.trials_page = min(st.session_state.get('trials_page', 1), page_count)
+
+    page_col, summary_col = st.columns([1, 3])
+    page = page_col.number_input(f"Page (of {page_count})", min_value=1, max_value=page_count, step=1,
+                                 key='trials_page')
+    first = (page - 1) * TRIALS_PAGE_SIZE
+    page_trials = matches[first:first + TRIALS_PAGE_SIZE]
+    summary_col.caption(f"Showing trials {first + 1}–{first + len(page_trials)} of {len(matches):,}")
+
+    # Only the visible page is turned into HTML, rendered in a single scrolling iframe
+    page_html = "".join(render_trial_card(trial) for trial in page_trials)
+    components.html(page_html, height=min(len(page_trials), 3) * TRIAL_CARD_HEIGHT, scrolling=True)
+
+
+def render_trial_card(trial):
+    """HTML for one trial card; text fields come from external records and are escaped"""
+    status_color = "#10b981" if trial['status'] == "Recruiting" else "#f59e0b"
+
+    interventions_html = "".join([
+        f'<span style="background: rgba(102,126,234,0.3); padding: 4px 12px; border-radius: 20px; font-size: 0.8rem; color:white; margin-right: 0.5rem; margin-bottom: 0.5rem; display: inline-block;">{html.escape(intervention)}</span>'
+        for intervention in trial['interventions']
+    ])
+
+    return textwrap.dedent(f"""
+    <div style="background: #1e293b; padding: 1.5rem; border-radius: 1rem; margin-bottom: 1.5rem; box-shadow: 0 4px 12px rgba(0,0,0,0.2); font-family: sans-serif;">
+        <div style="display: flex; justify-content: space-between; align-items: start; margin-bottom: 1rem;">
+            <h4 style="margin:0; color:white; flex:1;">{html.escape(trial['title'])}</h4>
+            <div style="text-align: right;">
+                <span style="background: {status_color}20; color:{status_color}; padding: 4px 12px; border-radius: 20px; font-size: 0.8rem; border: 1px solid {status_color}40;">
+                    {html.escape(trial['status'])}
+                </span>
             </div>
+        </div>
 
-            <div style="margin-bottom: 1rem;">
-                <div style="font-size: 0.9rem; color:rgba(255,255,255,0.7); margin-bottom: 0.5rem;">Interventions</div>
-                <div style="display: flex; flex-wrap: wrap; gap: 0.5rem;">
-                    {interventions_html}
-                </div>
+        <div style="display: grid; grid-template-columns: 1fr 1fr 1fr; gap: 1rem; margin-bottom: 1rem;">
+            <div style="text-align: center;">
+                <div style="font-size: 0.9rem; color:rgba(255,255,255,0.7);">Sponsor</div>
+                <div style="font-weight: bold; color:white;">{html.escape(trial['sponsor'])}</div>
+            </div>
+            <div style="text-align: center;">
+                <div style="font-size: 0.9rem; color:rgba(255,255,255,0.7);">Study Phase</div>
+                <div style="font-weight: bold; color:white;">{html.escape(trial['phase'])}</div>
+            </div>
+            <div style="text-align: center;">
+                <div style="font-size: 0.9rem; color:rgba(255,255,255,0.7);">Expected Completion</div>
+                <div style="font-weight: bold; color:white;">{html.escape(str(trial.get('completion') or 'N/A'))}</div>
             </div>
+        </div>
 
-            <div style="display: flex; justify-content: space-between; align-items: center;">
-                <small style="color:rgba(255,255,255,0.6);">Patient Count: {trial.get('patients', 'N/A')}</small>
-                <a href="{trial['url']}" target="_blank" style="
-                    background: linear-gradient(135deg, #667eea, #764ba2);
-                    color: white;
-                    padding: 8px 16px;
-                    border-radius: 8px;
-                    text-decoration: none;
-                    font-weight: 500;
-                ">
-                    🔍 View Details
-                </a>
+        <div style="margin-bottom: 1rem;">
+            <div style="font-size: 0.9rem; color:rgba(255,255,255,0.7); margin-bottom: 0.5rem;">Interventions</div>
+            <div style="display: flex; flex-wrap: wrap; gap: 0.5rem;">
+                {interventions_html}
             </div>
         </div>
-        """)
 
-        # 用 iframe 渲染 HTML，保证不会被当成代码块
-        components.html(card_html, height=300, scrolling=True)
+        <div style="display: flex; justify-content: space-between; align-items: center;">
+            <small style="color:rgba(255,255,255,0.6);">Patient Count: {trial.get('patients') or 'N/A'}</small>
+            <a href="{html.escape(trial['url'])}" target="_blank" style="
+                background: linear-gradient(135deg, #667eea, #764ba2);
+                color: white;
+                padding: 8px 16px;
+                border-radius: 8px;
+                text-decoration: none;
+                font-weight: 500;
+            ">
+                🔍 View Details
+            </a>
+        </div>
+    </div>
+    """)
 
 
 # ---------------------------
@@ -1625,34 +3433,26 @@ def main():
     # Render Header
     render_header()
 
-    # Use Tabs to Organize Content
-    tab1, tab2, tab3, tab4, tab5 = st.tabs(
-        ["📊 Market Overview", "🌟 Comprehensive Scoring", "🎨 Advanced Visualizations", "📰 News & Updates",
-         "💊 Clinical Trials"])
-
-    with tab1:
-        # Market Overview Tab - Contains sidebar and main content
-        col1, col2 = st.columns([1, 4])
-        with col1:
-            render_sidebar(data_manager)
-        with col2:
-            render_market_overview(data_manager)
-
-    with tab2:
-        # Comprehensive Scoring Tab
-        render_dynamic_score_panel(data_manager)
-
-    with tab3:
-        # Advanced Visualizations Tab
-        render_advanced_visualizations(data_manager)
-
-    with tab4:
-        # News & Updates Tab
-        render_news_analysis(data_manager)
-
-    with tab5:
-        # Clinical Trials Tab
-        render_clinical_trials(data_manager)
+    # Control panel lives in st.sidebar and is needed by every view
+    render_sidebar(data_manager)
+
+    views = {
+        "📊 Market Overview": render_market_overview,
+        "🌟 Comprehensive Scoring": render_dynamic_score_panel,
+        "🎨 Advanced Visualizations": render_advanced_visualizations,
+        "📰 News & Updates": render_news_analysis,
+        "💊 Clinical Trials": render_clinical_trials
+    }
+
+    if st.session_state.get('lazy_tabs', True):
+        # Lazy Tabs: server-side view selector, only the selected view fetches data and builds charts
+        selected = st.radio("View", list(views), horizontal=True, key='active_view', label_visibility='collapsed')
+        views[selected](data_manager)
+    else:
+        # Client-side tabs: every view is computed and shipped on each run
+        for tab, render_view in zip(st.tabs(list(views)), views.values()):
+            with tab:
+                render_view(data_manager)
 
     # Footer
     st.markdown("---")
@@ -40,6 +40,9 @@ def main():
         "--console",
         "--name=LiverCancerDrugPlatform",
         "--add-data=app.py;.",
+        "--add-data=trial_ingest.py;.",
+        "--add-data=provider_replay.py;.",
+        "--add-data=components;components",
         "--hidden-import=streamlit",
         "--hidden-import=plotly",
         "--hidden-import=pandas",
@@ -65,6 +68,18 @@ def main():
     shutil.copy2("app.py", release_folder)
     print("✅ 已复制app.py")
 
+    # 复制临床试验导入脚本 (app.py 依赖)
+    shutil.copy2("trial_ingest.py", release_folder)
+    print("✅ 已复制trial_ingest.py")
+
+    # 复制离线回放/模拟服务器脚本 (app.py 依赖)
+    shutil.copy2("provider_replay.py", release_folder)
+    print("✅ 已复制provider_replay.py")
+
+    # 复制前端组件 (流式股价图)
+    shutil.copytree("components", os.path.join(release_folder, "components"), dirs_exist_ok=True)
+    print("✅ 已复制components")
+
     # 复制启动器文件
     shutil.copy2("app_launcher.py", release_folder)
     print("✅ 已复制app_launcher.py")
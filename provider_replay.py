@@ -0,0 +1,281 @@
+"""
+Record/replay fixtures and a local stand-in server for the data providers of the
+Liver Cancer Drug Intelligence Platform, for offline load tests and benchmarks.
+
+Recording: start the app with PROVIDER_RECORD_DIR=fixtures and every HTTP provider response
+(Alpha Vantage, FMP, GNews, journal RSS) is saved as one JSON fixture, with API keys stripped.
+
+Replay: serve the fixtures and point the app at the server with PROVIDER_BASE_URL:
+    python provider_replay.py --fixtures fixtures --latency 120 --jitter 60 --error-rate 0.05 --throttle 5/60
+    PROVIDER_BASE_URL=http://127.0.0.1:8765 streamlit run app.py
+
+Requests the fixtures do not cover get a synthesized answer of the right shape (--no-synthesize
+answers 404 instead). GET /__stats returns request counters as JSON.
+
+yfinance keeps its own HTTP session and cannot be redirected, so the app leaves Yahoo Finance
+out of its provider chains while PROVIDER_BASE_URL is set.
+"""
+import argparse
+import base64
+import hashlib
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+DEFAULT_PORT = 8765
+SECRET_PARAMS = ('apikey', 'api_key', 'token')  # Query parameters never written to a fixture
+KEPT_HEADERS = ('Content-Type', 'ETag', 'Last-Modified')
+
+
+# ---------------------------
+# Fixtures: One Recorded Response per Request
+# ---------------------------
+def normalized_url(url):
+    """URL without secrets and with sorted query parameters: the identity of a recorded request"""
+    parts = urlsplit(url)
+    query = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+                   if k.lower() not in SECRET_PARAMS)
+    return f"{parts.scheme}://{parts.netloc}{parts.path}" + (f"?{urlencode(query)}" if query else "")
+
+
+def rewrite_url(url, base_url):
+    """https://host/path?query -> {base_url}/host/path?query, the stand-in server's view of the same request"""
+    parts = urlsplit(url)
+    return f"{base_url.rstrip('/')}/{parts.netloc}{parts.path}" + (f"?{parts.query}" if parts.query else "")
+
+
+def original_url(path):
+    """Inverse of rewrite_url() for a request path received by the stand-in server"""
+    host, _, rest = path.lstrip('/').partition('/')
+    return f"https://{host}/{rest}"
+
+
+class FixtureStore:
+    """Directory of JSON fixtures named by a hash of the normalized request URL"""
+
+    def __init__(self, path):
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+
+    def _file(self, url):
+        return os.path.join(self.path, hashlib.sha1(normalized_url(url).encode()).hexdigest()[:16] + '.json')
+
+    def save(self, url, status, headers, body):
+        try:
+            text, encoding = body.decode('utf-8'), 'utf-8'
+        except UnicodeDecodeError:
+            text, encoding = base64.b64encode(body).decode('ascii'), 'base64'
+        fixture = {
+            'url': normalized_url(url),
+            'status': status,
+            'headers': {k: headers[k] for k in KEPT_HEADERS if k in headers},
+            'encoding': encoding,
+            'body': text,
+            'recorded_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        }
+        # Each save writes its own temp file, so concurrent recorders of the same URL never leave a half-written fixture
+        fd, tmp = tempfile.mkstemp(dir=self.path, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(fixture, f, ensure_ascii=False, indent=1)
+            os.replace(tmp, self._file(url))
+        except BaseException:
+            os.remove(tmp)
+            raise
+
+    def save_response(self, url, response):
+        """Record a requests.Response (reads the whole body; iter_content() still replays it afterwards)"""
+        self.save(url, response.status_code, response.headers, response.content)
+
+    def load(self, url):
+        """(status, headers, body bytes) or None when the request was never recorded"""
+        try:
+            with open(self._file(url), encoding='utf-8') as f:
+                fixture = json.load(f)
+        except FileNotFoundError:
+            return None
+        body = fixture['body']
+        body = base64.b64decode(body) if fixture['encoding'] == 'base64' else body.encode('utf-8')
+        return fixture['status'], fixture['headers'], body
+
+    def __len__(self):
+        return sum(1 for name in os.listdir(self.path) if name.endswith('.json'))
+
+
+# ---------------------------
+# Synthesized Answers for Requests Without a Fixture
+# ---------------------------
+def _json(payload, status=200):
+    return status, {'Content-Type': 'application/json'}, json.dumps(payload).encode('utf-8')
+
+
+def _price(symbol):
+    # Stable per symbol, moving a little per request
+    return round((int(hashlib.sha1(symbol.encode()).hexdigest()[:4], 16) % 200 + 10) * random.uniform(0.98, 1.02), 2)
+
+
+def synthesize(url):
+    """A payload shaped like the real provider's answer to `url`, or None for unknown endpoints"""
+    parts = urlsplit(url)
+    query = dict(parse_qsl(parts.query))
+    if parts.netloc.endswith('alphavantage.co'):
+        if query.get('function') == 'GLOBAL_QUOTE':
+            return _json({'Global Quote': {'01. symbol': query.get('symbol', ''),
+                                           '05. price': f"{_price(query.get('symbol', '')):.4f}"}})
+        if query.get('function') == 'REALTIME_BULK_QUOTES':
+            return _json({'Information': 'Thank you for using Alpha Vantage! This is a premium endpoint.'})
+    elif parts.netloc.endswith('financialmodelingprep.com'):
+        symbols = parts.path.rsplit('/', 1)[-1].split(',')
+        if '/quote/' in parts.path or '/market-capitalization/' in parts.path:
+            return _json([{'symbol': s, 'price': _price(s), 'marketCap': _price(s) * 1e9} for s in symbols])
+    elif parts.netloc.endswith('gnews.io'):
+        q = query.get('q', '')
+        return _json({'totalArticles': 3, 'articles': [
+            {'title': f"{q} update {i}", 'url': f"https://example.org/news/{i}", 'description': f"Mock article {i}.",
+             'publishedAt': datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'), 'source': {'name': 'Mock'}}
+            for i in range(1, 4)]})
+    else:
+        items = ''.join(f"<item><title>{parts.netloc} article {i}</title><link>https://{parts.netloc}/a/{i}</link>"
+                        f"<description>Mock entry {i}.</description></item>" for i in range(1, 4))
+        body = f'<?xml version="1.0"?><rss version="2.0"><channel><title>Mock</title>{items}</channel></rss>'
+        return 200, {'Content-Type': 'application/rss+xml'}, body.encode('utf-8')
+    return None
+
+
+def throttled(url):
+    """The provider's own rate-limit answer: Alpha Vantage and FMP answer in-band, the others with 429"""
+    host = urlsplit(url).netloc
+    if host.endswith('alphavantage.co'):
+        return _json({'Note': 'Thank you for using Alpha Vantage! Our standard API call frequency is '
+                              '5 calls per minute and 500 calls per day.'})
+    if host.endswith('financialmodelingprep.com'):
+        return _json({'Error Message': 'Limit Reach . Please upgrade your plan.'}, status=429)
+    return _json({'errors': ['Too many requests']}, status=429)
+
+
+# ---------------------------
+# Stand-in Server
+# ---------------------------
+class TokenBuckets:
+    """Per-host token bucket of `burst` requests refilled over `per_seconds`"""
+
+    def __init__(self, burst, per_seconds):
+        self.burst = burst
+        self.per_seconds = per_seconds
+        self._lock = threading.Lock()
+        self._buckets = {}  # host -> (tokens, updated_at)
+
+    def take(self, host):
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.get(host, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated_at) * self.burst / self.per_seconds)
+            allowed = tokens >= 1
+            self._buckets[host] = (tokens - 1 if allowed else tokens, now)
+            return allowed
+
+
+class MockProviderServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, fixtures, latency=0.0, jitter=0.0, error_rate=0.0, throttle=None,
+                 synthesize_missing=True):
+        super().__init__(address, MockProviderHandler)
+        self.fixtures = fixtures
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.buckets = TokenBuckets(*throttle) if throttle else None
+        self.synthesize_missing = synthesize_missing
+        self.stats_lock = threading.Lock()
+        self.stats = {'requests': 0, 'replayed': 0, 'synthesized': 0, 'missing': 0, 'errors': 0, 'throttled': 0}
+
+    def count(self, key):
+        with self.stats_lock:
+            self.stats[key] += 1
+
+    def answer(self, url):
+        """(status, headers, body, outcome) for one request"""
+        if self.buckets is not None and not self.buckets.take(urlsplit(url).netloc):
+            return (*throttled(url), 'throttled')
+        if random.random() < self.error_rate:
+            return 503, {'Content-Type': 'text/plain'}, b'Service Unavailable (injected)', 'errors'
+        recorded = self.fixtures.load(url) if self.fixtures is not None else None
+        if recorded is not None:
+            return (*recorded, 'replayed')
+        synthesized = synthesize(url) if self.synthesize_missing else None
+        if synthesized is not None:
+            return (*synthesized, 'synthesized')
+        return 404, {'Content-Type': 'text/plain'}, b'No fixture recorded for this request', 'missing'
+
+
+class MockProviderHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # Keep-alive, like the real providers, so client pooling is exercised
+
+    def do_GET(self):
+        if self.path == '/__stats':
+            with self.server.stats_lock:
+                status, headers, body = _json(dict(self.server.stats))
+        else:
+            self.server.count('requests')
+            delay = self.server.latency + random.uniform(-self.server.jitter, self.server.jitter)
+            if delay > 0:
+                time.sleep(delay)
+            status, headers, body, outcome = self.server.answer(original_url(self.path))
+            self.server.count(outcome)
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _throttle_arg(value):
+    burst, _, seconds = value.partition('/')
+    return int(burst), float(seconds or 1)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve recorded provider responses for offline benchmarks")
+    parser.add_argument('--fixtures', help="Fixture directory written with PROVIDER_RECORD_DIR (default: none)")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--latency', type=float, default=0, help="Added latency per request (ms)")
+    parser.add_argument('--jitter', type=float, default=0, help="Uniform ± jitter on the latency (ms)")
+    parser.add_argument('--error-rate', type=float, default=0, help="Fraction of requests answered with 503")
+    parser.add_argument('--throttle', type=_throttle_arg, help="Per-host rate limit as REQUESTS/SECONDS, e.g. 5/60")
+    parser.add_argument('--no-synthesize', action='store_true', help="Answer 404 for requests without a fixture")
+    args = parser.parse_args(argv)
+
+    if args.fixtures and not os.path.isdir(args.fixtures):
+        print(f"❌ Fixture directory not found: {args.fixtures}")
+        return 1
+
+    fixtures = FixtureStore(args.fixtures) if args.fixtures else None
+    server = MockProviderServer((args.host, args.port), fixtures, latency=args.latency / 1000,
+                                jitter=args.jitter / 1000, error_rate=args.error_rate, throttle=args.throttle,
+                                synthesize_missing=not args.no_synthesize)
+    print(f"✅ Serving {len(fixtures) if fixtures else 0} fixtures on http://{args.host}:{args.port}")
+    print(f"💡 Start the app with PROVIDER_BASE_URL=http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,75 @@
+"""Offline ingestion of a ClinicalTrials.gov bulk export against the sample dump in tests/fixtures"""
+import json
+import os
+import sys
+import zipfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from trial_ingest import TrialStore, iter_dump_studies
+
+SAMPLE_DUMP = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'ctg-studies-sample.json')
+LIVER_CANCER_IDS = {'NCT90000001', 'NCT90000002', 'NCT90000003'}  # By condition, condition, keyword
+
+
+def _studies():
+    with open(SAMPLE_DUMP, encoding='utf-8') as f:
+        return json.load(f)['studies']
+
+
+def _write_zip(path, studies):
+    """Bulk-export layout: one JSON file per study inside the archive"""
+    with zipfile.ZipFile(path, 'w') as archive:
+        for study in studies:
+            nct_id = study['protocolSection']['identificationModule']['nctId']
+            archive.writestr(f"{nct_id}.json", json.dumps(study))
+    return str(path)
+
+
+def test_iter_dump_studies_reads_zip_directory_and_file_alike(tmp_path):
+    studies = _studies()
+    expected = [s['protocolSection']['identificationModule']['nctId'] for s in studies]
+    dump_dir = tmp_path / 'studies'
+    dump_dir.mkdir()
+    for study in studies:
+        nct_id = study['protocolSection']['identificationModule']['nctId']
+        (dump_dir / f"{nct_id}.json").write_text(json.dumps(study), encoding='utf-8')
+
+    for dump in (SAMPLE_DUMP, _write_zip(tmp_path / 'ctg-studies.json.zip', studies), str(dump_dir)):
+        ids = [s['protocolSection']['identificationModule']['nctId'] for s in iter_dump_studies(dump)]
+        assert ids == expected
+
+
+def test_sync_keeps_only_liver_cancer_studies(tmp_path):
+    store = TrialStore(str(tmp_path / 'trials.db'))
+    stats = store.sync(_write_zip(tmp_path / 'ctg-studies.json.zip', _studies()))
+
+    assert stats == {'scanned': 5, 'matched': 3, 'added': 3, 'updated': 0, 'unchanged': 0, 'removed': 0}
+    trials = {t['nct_id']: t for t in store.trials()}
+    assert set(trials) == LIVER_CANCER_IDS
+    assert trials['NCT90000001']['phase'] == 'Phase III'
+    assert trials['NCT90000001']['interventions'] == ['Atezolizumab', 'Bevacizumab']
+    assert trials['NCT90000002']['phase'] == 'Phase II/III'
+    assert trials['NCT90000002']['status'] == 'Active, not recruiting'
+
+
+def test_resync_upserts_only_the_changed_study(tmp_path):
+    store = TrialStore(str(tmp_path / 'trials.db'))
+    store.sync(_write_zip(tmp_path / 'first.zip', _studies()))
+
+    studies = _studies()
+    changed = studies[1]['protocolSection']
+    changed['statusModule']['lastUpdatePostDateStruct']['date'] = '2025-06-30'
+    changed['statusModule']['overallStatus'] = 'COMPLETED'
+    upserted = []
+    upsert = store.upsert
+    store.upsert = lambda rows: (upserted.extend(r['nct_id'] for r in rows), upsert(rows))
+
+    stats = store.sync(_write_zip(tmp_path / 'second.zip', studies))
+
+    assert stats == {'scanned': 5, 'matched': 3, 'added': 0, 'updated': 1, 'unchanged': 2, 'removed': 0}
+    assert upserted == ['NCT90000002']
+    trials = {t['nct_id']: t for t in store.trials()}
+    assert trials['NCT90000002']['status'] == 'Completed'
+    assert trials['NCT90000002']['last_update'] == '2025-06-30'
+    assert set(trials) == LIVER_CANCER_IDS
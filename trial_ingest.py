@@ -0,0 +1,292 @@
+"""
+Offline ClinicalTrials.gov ingestion for the Liver Cancer Drug Intelligence Platform.
+
+Streams a ClinicalTrials.gov bulk export (the API v2 JSON ZIP, a directory of study JSON files,
+or a single JSON / NDJSON file) into an indexed local SQLite store, one study at a time, keeping
+only liver-cancer studies. Re-running it applies only studies whose last-update date changed.
+
+Usage:
+    python trial_ingest.py ctg-studies.json.zip
+    python trial_ingest.py ./studies/ --db data/clinical_trials.db
+"""
+import argparse
+import io
+import json
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+import zipfile
+
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'clinical_trials.db')
+BATCH_SIZE = 500  # Studies written per transaction
+READ_CHUNK_SIZE = 1 << 16  # Characters decoded at a time from a JSON stream
+
+# Studies are kept when a condition or keyword matches one of these (case-insensitive, whole words)
+LIVER_CANCER_TERMS = (
+    'hepatocellular', 'hcc', 'hepatoma', 'liver cancer', 'liver cancers', 'liver neoplasm',
+    'liver neoplasms', 'liver carcinoma', 'hepatic carcinoma', 'hepatic cancer', 'cholangiocarcinoma',
+)
+
+PHASE_LABELS = {
+    'EARLY_PHASE1': 'Early Phase I', 'PHASE1': 'Phase I', 'PHASE2': 'Phase II',
+    'PHASE3': 'Phase III', 'PHASE4': 'Phase IV', 'NA': 'N/A',
+}
+
+
+# ---------------------------
+# Dump Readers: One Study Dict at a Time
+# ---------------------------
+def iter_json_values(stream, chunk_size=READ_CHUNK_SIZE):
+    """
+    Yield the top-level values of a text stream holding a JSON array, NDJSON or concatenated JSON,
+    decoding incrementally so only the current value and one read chunk are held in memory.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ''
+    position = 0
+    in_array = False
+    eof = False
+    while True:
+        # Skip separators between values
+        while position < len(buffer) and (buffer[position].isspace() or buffer[position] in ',]'
+                                          or (buffer[position] == '[' and not in_array)):
+            if buffer[position] == '[':
+                in_array = True
+            position += 1
+        if position < len(buffer):
+            try:
+                value, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                value = None
+            else:
+                # A number is only complete once a separator follows it (the chunk may end mid-number)
+                if eof or not isinstance(value, (int, float)) or (
+                        end < len(buffer) and (buffer[end].isspace() or buffer[end] in ',]')):
+                    yield value
+                    position = end
+                    continue
+        elif eof:
+            return
+        chunk = stream.read(chunk_size)
+        eof = not chunk
+        buffer = buffer[position:] + chunk
+        position = 0
+
+
+def _iter_studies_in_stream(stream):
+    for value in iter_json_values(stream):
+        if isinstance(value, dict) and 'studies' in value:  # One page of the API v2 /studies endpoint
+            yield from value['studies']
+        elif isinstance(value, list):
+            yield from value
+        else:
+            yield value
+
+
+def iter_dump_studies(path):
+    """Yield raw study dicts from a bulk export: .zip, directory or .json/.ndjson file"""
+    if os.path.isdir(path):
+        for root, _, files in os.walk(path):
+            for name in sorted(files):
+                if name.endswith(('.json', '.ndjson')):
+                    with open(os.path.join(root, name), encoding='utf-8') as f:
+                        yield from _iter_studies_in_stream(f)
+    elif zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as archive:
+            for info in archive.infolist():
+                if info.is_dir() or not info.filename.endswith(('.json', '.ndjson')):
+                    continue
+                with archive.open(info) as member:
+                    yield from _iter_studies_in_stream(io.TextIOWrapper(member, encoding='utf-8'))
+    else:
+        with open(path, encoding='utf-8') as f:
+            yield from _iter_studies_in_stream(f)
+
+
+# ---------------------------
+# Study Normalization
+# ---------------------------
+_LIVER_CANCER_PATTERN = re.compile(r'\b(?:%s)\b' % '|'.join(re.escape(t) for t in LIVER_CANCER_TERMS), re.I)
+
+
+def is_liver_cancer_study(study):
+    conditions = study.get('protocolSection', {}).get('conditionsModule', {})
+    terms = conditions.get('conditions', []) + conditions.get('keywords', [])
+    return any(_LIVER_CANCER_PATTERN.search(term) for term in terms)
+
+
+def _phase_label(phases):
+    labels = [PHASE_LABELS.get(p, p) for p in phases or []]
+    if len(labels) > 1 and all(label.startswith('Phase ') for label in labels):
+        return 'Phase ' + '/'.join(label[len('Phase '):] for label in labels)  # e.g. Phase I/II
+    return '/'.join(labels) or 'N/A'
+
+
+def _status_label(status):
+    if status == 'ACTIVE_NOT_RECRUITING':
+        return 'Active, not recruiting'
+    return (status or 'Unknown').replace('_', ' ').capitalize()
+
+
+def normalize_study(study):
+    """Flatten an API v2 study record into the row stored for the dashboard"""
+    protocol = study.get('protocolSection', {})
+    identification = protocol.get('identificationModule', {})
+    status = protocol.get('statusModule', {})
+    design = protocol.get('designModule', {})
+    nct_id = identification['nctId']
+    return {
+        'nct_id': nct_id,
+        'title': identification.get('briefTitle') or identification.get('officialTitle') or nct_id,
+        'lead_sponsor': protocol.get('sponsorCollaboratorsModule', {}).get('leadSponsor', {}).get('name', 'Unknown'),
+        'phase': _phase_label(design.get('phases')),
+        'status': _status_label(status.get('overallStatus')),
+        'interventions': [i['name'] for i in protocol.get('armsInterventionsModule', {}).get('interventions', [])
+                          if i.get('name')],
+        'patients': design.get('enrollmentInfo', {}).get('count'),
+        'completion': (status.get('completionDateStruct', {}).get('date') or '')[:7] or None,
+        'url': f"https://clinicaltrials.gov/study/{nct_id}",
+        'last_update': status.get('lastUpdatePostDateStruct', {}).get('date') or '',
+    }
+
+
+# ---------------------------
+# TrialStore: Indexed Local Store of Studies
+# ---------------------------
+class TrialStore:
+    """SQLite (WAL) store of normalized studies, indexed by sponsor, phase, status and last update"""
+
+    COLUMNS = ('nct_id', 'title', 'lead_sponsor', 'phase', 'status', 'interventions', 'patients',
+               'completion', 'url', 'last_update')
+
+    def __init__(self, path=DEFAULT_DB_PATH):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS trials (
+                nct_id TEXT PRIMARY KEY,
+                title TEXT NOT NULL,
+                lead_sponsor TEXT NOT NULL,
+                phase TEXT NOT NULL,
+                status TEXT NOT NULL,
+                interventions TEXT NOT NULL,  -- JSON array of intervention names
+                patients INTEGER,
+                completion TEXT,
+                url TEXT NOT NULL,
+                last_update TEXT NOT NULL  -- ISO date of the study's last update post
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS trials_sponsor ON trials (lead_sponsor);
+            CREATE INDEX IF NOT EXISTS trials_phase ON trials (phase);
+            CREATE INDEX IF NOT EXISTS trials_status ON trials (status);
+            CREATE INDEX IF NOT EXISTS trials_last_update ON trials (last_update);
+        """)
+        self._conn.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM trials").fetchone()[0]
+
+    def last_updates(self):
+        """nct_id -> last_update for every stored study"""
+        with self._lock:
+            return dict(self._conn.execute("SELECT nct_id, last_update FROM trials"))
+
+    def upsert(self, rows):
+        placeholders = ', '.join('?' for _ in self.COLUMNS)
+        values = [tuple(json.dumps(row[c]) if c == 'interventions' else row[c] for c in self.COLUMNS)
+                  for row in rows]
+        with self._lock:
+            self._conn.executemany(f"INSERT OR REPLACE INTO trials VALUES ({placeholders})", values)
+            self._conn.commit()
+
+    def delete(self, nct_ids):
+        with self._lock:
+            self._conn.executemany("DELETE FROM trials WHERE nct_id = ?", [(n,) for n in nct_ids])
+            self._conn.commit()
+
+    def trials(self):
+        """All stored studies, most recently updated first"""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {', '.join(self.COLUMNS)} FROM trials ORDER BY last_update DESC, nct_id").fetchall()
+        trials = [dict(zip(self.COLUMNS, row)) for row in rows]
+        for trial in trials:
+            trial['interventions'] = json.loads(trial['interventions'])
+        return trials
+
+    def sync(self, dump_path, batch_size=BATCH_SIZE, progress=None):
+        """
+        Apply a bulk export incrementally: new or changed liver-cancer studies are written, unchanged
+        ones skipped, and stored studies that no longer match are removed. Returns a stats dict.
+        """
+        known = self.last_updates()
+        stats = {'scanned': 0, 'matched': 0, 'added': 0, 'updated': 0, 'unchanged': 0, 'removed': 0}
+        pending_upserts, pending_deletes = [], []
+
+        def flush():
+            if pending_upserts:
+                self.upsert(pending_upserts)
+                pending_upserts.clear()
+            if pending_deletes:
+                self.delete(pending_deletes)
+                pending_deletes.clear()
+
+        for study in iter_dump_studies(dump_path):
+            stats['scanned'] += 1
+            nct_id = study.get('protocolSection', {}).get('identificationModule', {}).get('nctId')
+            if not nct_id:
+                continue
+            if not is_liver_cancer_study(study):
+                if nct_id in known:
+                    pending_deletes.append(nct_id)
+                    del known[nct_id]
+                    stats['removed'] += 1
+            else:
+                stats['matched'] += 1
+                row = normalize_study(study)
+                previous = known.get(nct_id)
+                if previous == row['last_update']:
+                    stats['unchanged'] += 1
+                else:
+                    pending_upserts.append(row)
+                    known[nct_id] = row['last_update']
+                    stats['updated' if previous is not None else 'added'] += 1
+            if len(pending_upserts) + len(pending_deletes) >= batch_size:
+                flush()
+            if progress and stats['scanned'] % 10000 == 0:
+                progress(stats)
+        flush()
+        return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load a ClinicalTrials.gov bulk export into the local trial store")
+    parser.add_argument('dump', help="ctg-studies.json.zip, a directory of study JSON files, or a JSON/NDJSON file")
+    parser.add_argument('--db', default=DEFAULT_DB_PATH, help="SQLite store path (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.dump):
+        print(f"❌ Dump not found: {args.dump}")
+        return 1
+
+    started = time.time()
+    store = TrialStore(args.db)
+    stats = store.sync(args.dump, progress=lambda s: print(f"   ... {s['scanned']:,} studies scanned", flush=True))
+    print(f"✅ Scanned {stats['scanned']:,} studies in {time.time() - started:.1f}s: "
+          f"{stats['matched']:,} liver cancer, {stats['added']:,} added, {stats['updated']:,} updated, "
+          f"{stats['unchanged']:,} unchanged, {stats['removed']:,} removed")
+    print(f"📁 {len(store):,} studies in {args.db}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())